@@ -1,23 +1,21 @@
 """
 Main FastAPI application for the Healthcare Form Data Extraction PoC.
+Pipeline components are imported on first use, so PyMuPDF, docTR, the LLM
+client and the form filler are only loaded once a request needs them.
 """
 import logging
-import uuid
+import os
+import shutil
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, List, Optional, Union
 
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 
+from app_factory import API_VERSION, create_app
+from cache import DiskCache, LRUCache
 from config import settings
-from pdf_parser import extract_text_with_layout, is_pdf_file
-from ocr_parser import ocr_parser, is_image_file
-from llm_extractor import llm_extractor
-from validator import validate
-from form_filler import fill_form
+from file_types import is_image_file, is_pdf_file
+from text_blocks import TextBlocks
 
 
 # Configure logging
@@ -27,133 +25,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create FastAPI app
-app = FastAPI(
-    title="Healthcare Form Data Extraction API",
-    description="API for extracting data from healthcare forms using OCR and LLM",
-    version="0.1.0"
+# Caches of final responses keyed by the SHA-256 digest of the uploaded file:
+# a fast in-memory tier in front of a persistent tier that survives restarts
+response_cache = LRUCache(maxsize=settings.response_cache_size)
+disk_cache = DiskCache(
+    settings.cache_dir / "responses.sqlite3",
+    ttl=settings.disk_cache_ttl_days * 24 * 3600,
+    max_entries=settings.disk_cache_max_entries,
+    prune_interval=settings.disk_cache_prune_interval,
+    version=API_VERSION
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Create directories if they don't exist
-settings.initialize_directories()
+def extract_text_from_file(file_path: Path) -> Union[TextBlocks, List[Dict[str, Any]]]:
+    """
+    Extract text from a file (PDF or image).
+
+    Args:
+        file_path: Path to the file
 
-# Mount static files for screenshots
-app.mount("/screenshots", StaticFiles(directory=str(settings.screenshot_dir)), name="screenshots")
+    Returns:
+        Text blocks with coordinates: columnar TextBlocks for PDFs, a list of
+        dictionaries for images
+    """
+    # Check if the file is a PDF; its blocks are passed to the extractor as arrays
+    if is_pdf_file(file_path):
+        from pdf_parser import extract_text_blocks
+        return extract_text_blocks(file_path)
 
+    # Check if the file is an image
+    elif is_image_file(file_path):
+        from ocr_parser import get_ocr_parser
+        return get_ocr_parser().extract_text_from_image(file_path)
 
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {"message": "Healthcare Form Data Extraction API"}
+    # Unsupported file type
+    else:
+        raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
 
-@app.post("/api/extract")
-async def extract_form_data(file: UploadFile = File(...)) -> Dict[str, Any]:
+def extract_fields(text_blocks: Union[TextBlocks, List[Dict[str, Any]]]) -> Dict[str, Any]:
     """
-    Extract data from a healthcare form (PDF or image).
-    
+    Extract structured fields from text blocks using the LLM.
+
     Args:
-        file: Uploaded file (PDF or image)
-        
+        text_blocks: Text blocks with coordinates
+
     Returns:
-        JSON response with extracted data and screenshot URL
+        Dictionary containing extracted fields
     """
-    try:
-        # Generate a unique ID for this extraction
-        extraction_id = str(uuid.uuid4())
-        
-        # Save the uploaded file
-        file_path = await save_upload_file(file, extraction_id)
-        
-        # Extract text from the file
-        text_blocks = await extract_text_from_file(file_path)
-        
-        # Extract structured data using LLM
-        extracted_data = llm_extractor.extract_fields(text_blocks)
-        
-        # Validate the extracted data
-        validated_data = validate(extracted_data)
-        
-        # Fill the form and get screenshot
-        screenshot_path = fill_form(validated_data.dict(), extraction_id)
-        
-        # Generate screenshot URL
-        screenshot_url = f"/screenshots/{screenshot_path.name}" if screenshot_path else None
-        
-        # Return the response
-        return {
-            "status": "ok",
-            "data": validated_data.dict(),
-            "screenshot_url": screenshot_url
-        }
-    
-    except Exception as e:
-        logger.error(f"Error processing form: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-async def save_upload_file(file: UploadFile, file_id: str) -> Path:
+    from llm_extractor import llm_extractor
+    return llm_extractor.extract_fields(text_blocks)
+
+
+def validate_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Save an uploaded file to disk.
-    
+    Validate extracted form data.
+
     Args:
-        file: Uploaded file
-        file_id: Unique ID for the file
-        
+        data: Dictionary containing extracted form data
+
     Returns:
-        Path to the saved file
+        Dictionary containing the validated form data
     """
-    # Determine file extension
-    file_extension = Path(file.filename).suffix if file.filename else ""
-    
-    # Create file path
-    file_path = settings.upload_dir / f"{file_id}{file_extension}"
-    
-    # Save the file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    
-    return file_path
-
-
-async def extract_text_from_file(file_path: Path) -> List[Dict[str, Any]]:
+    from validator import validate
+
+    # Dump the model once; the same dict feeds the form filler, the caches and the response
+    return validate(data).model_dump(mode="json")
+
+
+def is_cacheable(data: Dict[str, Any]) -> bool:
     """
-    Extract text from a file (PDF or image).
-    
+    Check that validated form data is a clean extraction rather than an error placeholder.
+
     Args:
-        file_path: Path to the file
-        
+        data: Dictionary containing validated form data
+
     Returns:
-        List of text blocks with coordinates
+        False if the LLM extraction or the validation fell back to placeholder data
     """
-    # Check if the file is a PDF
-    if is_pdf_file(file_path):
-        return extract_text_with_layout(file_path)
-    
-    # Check if the file is an image
-    elif is_image_file(file_path):
-        return ocr_parser.extract_text_from_image(file_path)
-    
-    # Unsupported file type
-    else:
-        raise ValueError(f"Unsupported file type: {file_path.suffix}")
+    from llm_extractor import FALLBACK_DATA
+    from validator import ERROR_FORM_DATA
+
+    return data.get("patient_name") not in (FALLBACK_DATA["patient_name"], ERROR_FORM_DATA.patient_name)
+
+
+def fill_form(data: Dict[str, Any], extraction_id: str) -> Optional[Path]:
+    """
+    Fill the form with the validated data and take a screenshot.
+
+    Args:
+        data: Dictionary containing validated form data
+        extraction_id: Unique ID for the extraction
+
+    Returns:
+        Path to the screenshot if successful, None otherwise
+    """
+    from form_filler import fill_form_in_pool
+    return fill_form_in_pool(data, extraction_id)
+
+
+# Create FastAPI app
+app = create_app(
+    upload_dir=settings.upload_dir,
+    screenshot_dir=settings.screenshot_dir,
+    extract_text=extract_text_from_file,
+    extract_fields=extract_fields,
+    validate=validate_fields,
+    fill_form=fill_form,
+    response_cache=response_cache,
+    disk_cache=disk_cache,
+    is_cacheable=is_cacheable
+)
 
 
 if __name__ == "__main__":
-    # Run the FastAPI app with uvicorn
+    # In production, hand the process over to gunicorn managing uvicorn workers
+    if settings.workers > 1 and not settings.debug and shutil.which("gunicorn"):
+        os.execvp("gunicorn", [
+            "gunicorn", "app:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(settings.workers),
+            "--bind", f"{settings.host}:{settings.port}"
+        ])
+
+    # Run the FastAPI app with uvicorn (a single reloading worker in debug mode)
     uvicorn.run(
         "app:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=1 if settings.debug else settings.workers
     )
@@ -2,18 +2,20 @@
 Compatible FastAPI application for the Healthcare Form Data Extraction PoC.
 """
 import logging
-import uuid
+import os
+import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app_factory import create_app, save_mock_screenshot
+from file_types import is_image_file, is_pdf_file
+
 
 # Settings
 class Settings(BaseSettings):
@@ -33,6 +35,7 @@ class Settings(BaseSettings):
     host: str = Field("0.0.0.0", env="HOST")
     port: int = Field(8001, env="PORT")
     debug: bool = Field(True, env="DEBUG")
+    workers: int = Field(os.cpu_count() or 1, env="WORKERS")
     
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
@@ -42,10 +45,21 @@ class Settings(BaseSettings):
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, creating the working directories on first use.
+    
+    Returns:
+        Cached Settings instance
+    """
+    settings = Settings()
+    settings.initialize_directories()
+    return settings
+
+
 # Create a global settings instance
-settings = Settings()
-# Initialize directories
-settings.initialize_directories()
+settings = get_settings()
 
 
 # PDF Parser
@@ -53,6 +67,9 @@ def extract_text_with_layout(file_path: Path) -> List[Dict[str, Any]]:
     """
     Extract text from a PDF file with layout information.
     
+    Long documents are parsed page by page in the process pool shared with
+    the main application (see pdf_parser).
+    
     Args:
         file_path: Path to the PDF file
         
@@ -60,87 +77,13 @@ def extract_text_with_layout(file_path: Path) -> List[Dict[str, Any]]:
         List of dictionaries containing text blocks with coordinates
     """
     try:
-        import fitz  # PyMuPDF
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"PDF file not found: {file_path}")
-        
-        # Open the PDF file
-        doc = fitz.open(file_path)
-        
-        # List to store all text blocks from all pages
-        all_blocks = []
-        
-        # Process each page
-        for page_num, page in enumerate(doc):
-            # Extract text with dict format to get blocks with coordinates
-            blocks = page.get_text("dict")["blocks"]
-            
-            # Process each block
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        if "spans" in line:
-                            for span in line["spans"]:
-                                # Extract text and position data
-                                text_block = {
-                                    "text": span["text"],
-                                    "page": page_num + 1,
-                                    "x0": span["bbox"][0],
-                                    "y0": span["bbox"][1],
-                                    "x1": span["bbox"][2],
-                                    "y1": span["bbox"][3],
-                                    "font": span.get("font", ""),
-                                    "size": span.get("size", 0),
-                                    "color": span.get("color", 0)
-                                }
-                                all_blocks.append(text_block)
-        
-        # Close the document
-        doc.close()
-        
-        return all_blocks
+        from pdf_parser import extract_text_with_layout as extract_pdf_text
     except ImportError:
         # If PyMuPDF is not available, return mock data
         logging.warning("PyMuPDF not available, returning mock data")
         return [{"text": "Mock PDF text", "page": 1, "x0": 0, "y0": 0, "x1": 100, "y1": 20}]
-
-
-def is_pdf_file(file_path: Path) -> bool:
-    """
-    Check if a file is a PDF based on its extension and content.
-    
-    Args:
-        file_path: Path to the file
-        
-    Returns:
-        True if the file is a PDF, False otherwise
-    """
-    # Check file extension
-    if file_path.suffix.lower() != ".pdf":
-        return False
     
-    # Check file content (PDF signature)
-    try:
-        with open(file_path, "rb") as f:
-            header = f.read(4)
-            return header == b"%PDF"
-    except Exception:
-        return False
-
-
-def is_image_file(file_path: Path) -> bool:
-    """
-    Check if a file is an image based on its extension.
-    
-    Args:
-        file_path: Path to the file
-        
-    Returns:
-        True if the file is an image, False otherwise
-    """
-    image_extensions = [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]
-    return file_path.suffix.lower() in image_extensions
+    return extract_pdf_text(file_path)
 
 
 # OCR Parser (simplified)
@@ -250,6 +193,10 @@ class FormData(BaseModel):
 
 
 # Validator (simplified)
+# Fields the LLM may return as a comma-separated string instead of a list
+LIST_FIELDS = ("medical_history", "current_medications", "allergies")
+
+
 def validate(data: Dict[str, Any]) -> FormData:
     """
     Validate extracted form data.
@@ -260,14 +207,11 @@ def validate(data: Dict[str, Any]) -> FormData:
     Returns:
         Validated FormData object
     """
-    # Convert list fields to proper format
-    for list_field in ['medical_history', 'current_medications', 'allergies']:
-        if list_field in data and isinstance(data[list_field], str):
-            # Convert string to list if needed
-            if data[list_field]:
-                data[list_field] = [item.strip() for item in data[list_field].split(',')]
-            else:
-                data[list_field] = []
+    # Convert comma-separated list fields to lists; values that are already lists are left as-is
+    for list_field in LIST_FIELDS:
+        value = data.get(list_field)
+        if isinstance(value, str):
+            data[list_field] = [item.strip() for item in value.split(',')] if value else []
     
     # Validate with Pydantic model
     validated_data = FormData(**data)
@@ -287,154 +231,72 @@ def fill_form(data: Dict[str, Any], extraction_id: str) -> Optional[Path]:
     Returns:
         Path to the screenshot if successful, None otherwise
     """
-    # Create a simple text file as a mock screenshot
-    screenshot_path = settings.screenshot_dir / f"{extraction_id}_screenshot.png"
-    with open(screenshot_path, "w") as f:
-        f.write(f"Mock screenshot for form data: {data}")
-    
-    return screenshot_path
-
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if settings.debug else logging.WARNING,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-
-# Create FastAPI app
-app = FastAPI(
-    title="Healthcare Form Data Extraction API",
-    description="API for extracting data from healthcare forms using OCR and LLM",
-    version="0.1.0"
-)
+    # Write a placeholder PNG as the mock screenshot
+    return save_mock_screenshot(settings.screenshot_dir, extraction_id)
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Mount static files for screenshots
-app.mount("/screenshots", StaticFiles(directory=str(settings.screenshot_dir)), name="screenshots")
-
-
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {"message": "Healthcare Form Data Extraction API"}
-
-
-@app.post("/api/extract")
-async def extract_form_data(file: UploadFile = File(...)) -> Dict[str, Any]:
+def validate_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Extract data from a healthcare form (PDF or image).
+    Validate extracted form data, passing it through unchanged if validation fails.
     
     Args:
-        file: Uploaded file (PDF or image)
+        data: Dictionary containing extracted form data
         
     Returns:
-        JSON response with extracted data and screenshot URL
+        Dictionary containing the validated form data
     """
     try:
-        # Generate a unique ID for this extraction
-        extraction_id = str(uuid.uuid4())
-        
-        # Save the uploaded file
-        file_path = await save_upload_file(file, extraction_id)
-        
-        # Extract text from the file
-        text_blocks = await extract_text_from_file(file_path)
-        
-        # Extract structured data
-        extracted_data = extract_fields(text_blocks)
-        
-        # Validate the extracted data
-        try:
-            validated_data = validate(extracted_data)
-        except Exception as e:
-            logger.error(f"Validation error: {str(e)}")
-            # If validation fails, use the extracted data directly
-            # This should be safe now since we've updated the extractor to provide valid defaults
-            validated_data = extracted_data
-        
-        # Fill the form and get screenshot
-        screenshot_path = fill_form(validated_data, extraction_id)
-        
-        # Generate screenshot URL
-        screenshot_url = f"/screenshots/{screenshot_path.name}" if screenshot_path else None
-        
-        # Return the response
-        return {
-            "status": "ok",
-            "data": validated_data,
-            "screenshot_url": screenshot_url
-        }
-    
+        return validate(data).model_dump(mode="json")
     except Exception as e:
-        logger.error(f"Error processing form: {str(e)}")
-        
-        # Create a fallback response with error information
-        fallback_data = {
-            "patient_name": "Error processing form",
-            "date_of_birth": "Unknown",
-            "gender": "Unknown",
-            "address": "Error processing form",
-            "phone_number": "Unknown",
-            "email": None,
-            "insurance_provider": "Unknown",
-            "insurance_id": "Unknown",
-            "medical_history": [],
-            "current_medications": [],
-            "allergies": [],
-            "primary_complaint": f"Error: {str(e)}",
-            "appointment_date": None,
-            "doctor_name": None
-        }
-        
-        # Try to validate the fallback data
-        try:
-            validated_fallback = validate(fallback_data)
-            return {
-                "status": "error",
-                "data": validated_fallback,
-                "error": str(e),
-                "screenshot_url": None
-            }
-        except:
-            # If even the fallback validation fails, return a simple error
-            raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Validation error: {str(e)}")
+        # If validation fails, use the extracted data directly
+        # This should be safe now since we've updated the extractor to provide valid defaults
+        return data
 
 
-async def save_upload_file(file: UploadFile, file_id: str) -> Path:
+def build_error_response(error: Exception) -> Dict[str, Any]:
     """
-    Save an uploaded file to disk.
+    Build a fallback response for a form that could not be processed.
     
     Args:
-        file: Uploaded file
-        file_id: Unique ID for the file
+        error: Exception raised while processing the form
         
     Returns:
-        Path to the saved file
+        JSON response with placeholder data and the error message
     """
-    # Determine file extension
-    file_extension = Path(file.filename).suffix if file.filename else ""
-    
-    # Create file path
-    file_path = settings.upload_dir / f"{file_id}{file_extension}"
-    
-    # Save the file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Create a fallback response with error information
+    fallback_data = {
+        "patient_name": "Error processing form",
+        "date_of_birth": "Unknown",
+        "gender": "Unknown",
+        "address": "Error processing form",
+        "phone_number": "Unknown",
+        "email": None,
+        "insurance_provider": "Unknown",
+        "insurance_id": "Unknown",
+        "medical_history": [],
+        "current_medications": [],
+        "allergies": [],
+        "primary_complaint": f"Error: {str(error)}",
+        "appointment_date": None,
+        "doctor_name": None
+    }
     
-    return file_path
+    # Try to validate the fallback data
+    try:
+        validated_fallback = validate(fallback_data)
+        return {
+            "status": "error",
+            "data": validated_fallback.model_dump(mode="json"),
+            "error": str(error),
+            "screenshot_url": None
+        }
+    except:
+        # If even the fallback validation fails, return a simple error
+        raise HTTPException(status_code=500, detail=str(error))
 
 
-async def extract_text_from_file(file_path: Path) -> List[Dict[str, Any]]:
+def extract_text_from_file(file_path: Path) -> List[Dict[str, Any]]:
     """
     Extract text from a file (PDF or image).
     
@@ -457,11 +319,40 @@ async def extract_text_from_file(file_path: Path) -> List[Dict[str, Any]]:
         raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO if settings.debug else logging.WARNING,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Create FastAPI app
+app = create_app(
+    upload_dir=settings.upload_dir,
+    screenshot_dir=settings.screenshot_dir,
+    extract_text=extract_text_from_file,
+    extract_fields=extract_fields,
+    validate=validate_fields,
+    fill_form=fill_form,
+    on_error=build_error_response
+)
+
+
 if __name__ == "__main__":
-    # Run the FastAPI app with uvicorn
+    # In production, hand the process over to gunicorn managing uvicorn workers
+    if settings.workers > 1 and not settings.debug and shutil.which("gunicorn"):
+        os.execvp("gunicorn", [
+            "gunicorn", "app_compatible:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(settings.workers),
+            "--bind", f"{settings.host}:{settings.port}"
+        ])
+    
+    # Run the FastAPI app with uvicorn (a single reloading worker in debug mode)
     uvicorn.run(
         "app_compatible:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=1 if settings.debug else settings.workers
     )
@@ -0,0 +1,278 @@
+"""
+Application factory for the Healthcare Form Data Extraction PoC.
+Builds the FastAPI app shared by the real, compatible and mock variants from
+injected pipeline components.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from secrets import token_urlsafe
+from typing import Any, Callable, Dict, List, Optional
+
+import aiofiles
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+from cache import DiskCache, LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+# API version, also used to tag persistent cache entries
+API_VERSION = "0.1.0"
+
+# Size of the chunks used to stream uploads to disk (1 MiB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Minimal valid PNG (1x1 white pixel) written as the screenshot by the mock form fillers
+MOCK_SCREENSHOT_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde"
+    b"\x00\x00\x00\x0cIDATx\xdac\xf8\xff\xff?\x00\x05\xfe\x02\xfe3\x12\x95\x14"
+    b"\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files served with long-lived cache headers, for content that never changes once written."""
+
+    def file_response(self, *args: Any, **kwargs: Any) -> Response:
+        """Serve a file, marking it as cacheable by browsers and proxies for a year."""
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+def create_app(
+    upload_dir: Path,
+    screenshot_dir: Path,
+    extract_text: Callable[[Path], Any],
+    extract_fields: Callable[[Any], Dict[str, Any]],
+    validate: Callable[[Dict[str, Any]], Dict[str, Any]],
+    fill_form: Callable[[Dict[str, Any], str], Optional[Path]],
+    on_error: Optional[Callable[[Exception], Dict[str, Any]]] = None,
+    response_cache: Optional[LRUCache] = None,
+    disk_cache: Optional[DiskCache] = None,
+    is_cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> FastAPI:
+    """
+    Create the FastAPI app with the given pipeline components.
+
+    The synchronous pipeline steps are run in the threadpool so that a single
+    worker can serve concurrent uploads.
+
+    Args:
+        upload_dir: Directory where uploaded files are saved
+        screenshot_dir: Directory served under /screenshots
+        extract_text: Function extracting text blocks from a saved file, in any
+            layout accepted by extract_fields
+        extract_fields: Function extracting form fields from text blocks
+        validate: Function validating the fields into a JSON-ready dictionary
+        fill_form: Function filling the form and returning the screenshot path
+        on_error: Optional function building the response for a failed extraction
+            (errors are returned as HTTP 500 if not provided)
+        response_cache: Optional in-memory cache of responses keyed by upload digest
+        disk_cache: Optional persistent cache of responses keyed by upload digest
+        is_cacheable: Optional function telling whether validated data may be cached;
+            pipelines that fall back to placeholder data on errors use it so that
+            transient failures are not served again for the same document
+
+    Returns:
+        Configured FastAPI app
+    """
+    # Create FastAPI app
+    app = FastAPI(
+        title="Healthcare Form Data Extraction API",
+        description="API for extracting data from healthcare forms using OCR and LLM",
+        version=API_VERSION,
+        # Serialize responses with orjson instead of the standard library json module
+        default_response_class=ORJSONResponse
+    )
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Mount static files for screenshots; each screenshot is named after its unique
+    # extraction ID and never rewritten, so clients may cache it indefinitely
+    app.mount(
+        "/screenshots",
+        ImmutableStaticFiles(directory=str(screenshot_dir), html=False, check_dir=True),
+        name="screenshots"
+    )
+
+    # Response caches checked in order (fast in-memory tier first)
+    caches = [cache for cache in (response_cache, disk_cache) if cache is not None]
+
+    @app.get("/")
+    async def root():
+        """Root endpoint."""
+        return {"message": "Healthcare Form Data Extraction API"}
+
+    @app.post("/api/extract")
+    async def extract_form_data(file: UploadFile = File(...)) -> Dict[str, Any]:
+        """
+        Extract data from a healthcare form (PDF or image).
+
+        Args:
+            file: Uploaded file (PDF or image)
+
+        Returns:
+            JSON response with extracted data and screenshot URL
+        """
+        try:
+            # Generate a unique ID for this extraction
+            extraction_id = token_urlsafe(16)
+
+            # Save the uploaded file, hashing its content while it streams to disk
+            digest = hashlib.sha256()
+            file_path = await save_upload_file(file, upload_dir, extraction_id, digest)
+            content_hash = digest.hexdigest()
+
+            # Short-circuit the pipeline if this document was already processed
+            # (the caches may hit the disk, so they are used from the threadpool)
+            for index, cache in enumerate(caches):
+                cached_response = await run_in_threadpool(cache.get, content_hash)
+                if cached_response is not None:
+                    logger.info(f"Returning cached extraction for document {content_hash}")
+                    # Promote hits to the faster tiers
+                    for faster_cache in caches[:index]:
+                        await run_in_threadpool(faster_cache.set, content_hash, cached_response)
+                    file_path.unlink(missing_ok=True)
+                    return cached_response
+
+            # Extract text from the file
+            text_blocks = await run_in_threadpool(extract_text, file_path)
+
+            # Extract structured data
+            extracted_data = await run_in_threadpool(extract_fields, text_blocks)
+
+            # Validate the extracted data
+            validated_data = await run_in_threadpool(validate, extracted_data)
+
+            # Fill the form and get screenshot
+            screenshot_path = await run_in_threadpool(fill_form, validated_data, extraction_id)
+
+            # Generate screenshot URL
+            screenshot_url = f"/screenshots/{screenshot_path.name}" if screenshot_path else None
+
+            # Cache and return the response, unless the pipeline fell back on an error
+            response = {
+                "status": "ok",
+                "data": validated_data,
+                "screenshot_url": screenshot_url
+            }
+            if is_cacheable is None or is_cacheable(validated_data):
+                for cache in caches:
+                    await run_in_threadpool(cache.set, content_hash, response)
+            return response
+
+        except Exception as e:
+            logger.error(f"Error processing form: {str(e)}")
+            if on_error is not None:
+                return on_error(e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return app
+
+
+async def save_upload_file(
+    file: UploadFile,
+    upload_dir: Path,
+    file_id: str,
+    digest: Optional[Any] = None,
+    max_size: Optional[int] = None
+) -> Path:
+    """
+    Save an uploaded file to disk.
+
+    Args:
+        file: Uploaded file
+        upload_dir: Directory to save the file in
+        file_id: Unique ID for the file
+        digest: Optional hashlib object updated with the file content
+        max_size: Optional largest accepted size in bytes, enforced while streaming
+            so that uploads of unknown length are limited too
+
+    Returns:
+        Path to the saved file
+
+    Raises:
+        HTTPException: 413 if the upload is larger than max_size
+    """
+    # Determine file extension
+    file_extension = Path(file.filename).suffix if file.filename else ""
+
+    # Create file path
+    file_path = upload_dir / f"{file_id}{file_extension}"
+
+    # Stream the upload to disk in fixed-size chunks to keep memory bounded
+    size = 0
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                break
+            if digest is not None:
+                digest.update(chunk)
+            await f.write(chunk)
+
+    # Discard the partial file of an oversized upload
+    if max_size is not None and size > max_size:
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+
+    return file_path
+
+
+def save_mock_screenshot(screenshot_dir: Path, extraction_id: str) -> Path:
+    """
+    Write a placeholder screenshot for an extraction.
+
+    Args:
+        screenshot_dir: Directory to save the screenshot in
+        extraction_id: Unique ID for the extraction
+
+    Returns:
+        Path to the screenshot
+    """
+    return write_screenshot(screenshot_dir, extraction_id, MOCK_SCREENSHOT_PNG)
+
+
+def write_screenshot(screenshot_dir: Path, extraction_id: str, png: bytes) -> Path:
+    """
+    Atomically write the screenshot for an extraction.
+
+    Screenshots may be written after their URL was returned, and are served as
+    immutable, so the image is written to a temporary file in the same directory
+    and renamed into place; a client never sees a partially written file.
+
+    Args:
+        screenshot_dir: Directory to save the screenshot in
+        extraction_id: Unique ID for the extraction
+        png: Encoded PNG image
+
+    Returns:
+        Path to the screenshot
+    """
+    screenshot_path = screenshot_dir / f"{extraction_id}_screenshot.png"
+    fd, temp_path = tempfile.mkstemp(dir=screenshot_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(png)
+        os.replace(temp_path, screenshot_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return screenshot_path
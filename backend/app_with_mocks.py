@@ -3,18 +3,16 @@ Modified FastAPI application for the Healthcare Form Data Extraction PoC.
 Uses mock functionality for problematic components.
 """
 import logging
-import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app_factory import create_app, save_mock_screenshot
+
 
 # Mock Settings
 class Settings(BaseSettings):
@@ -43,10 +41,21 @@ class Settings(BaseSettings):
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, creating the working directories on first use.
+    
+    Returns:
+        Cached Settings instance
+    """
+    settings = Settings()
+    settings.initialize_directories()
+    return settings
+
+
 # Create a global settings instance
-settings = Settings()
-# Initialize directories
-settings.initialize_directories()
+settings = get_settings()
 
 
 # Mock FormData model
@@ -76,102 +85,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create FastAPI app
-app = FastAPI(
-    title="Healthcare Form Data Extraction API",
-    description="API for extracting data from healthcare forms using OCR and LLM",
-    version="0.1.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Mount static files for screenshots
-app.mount("/screenshots", StaticFiles(directory=str(settings.screenshot_dir)), name="screenshots")
-
-
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {"message": "Healthcare Form Data Extraction API"}
-
-
-@app.post("/api/extract")
-async def extract_form_data(file: UploadFile = File(...)) -> Dict[str, Any]:
-    """
-    Extract data from a healthcare form (PDF or image).
-    
-    Args:
-        file: Uploaded file (PDF or image)
-        
-    Returns:
-        JSON response with extracted data and screenshot URL
-    """
-    try:
-        # Generate a unique ID for this extraction
-        extraction_id = str(uuid.uuid4())
-        
-        # Save the uploaded file
-        file_path = await save_upload_file(file, extraction_id)
-        
-        # Mock data extraction (in a real implementation, this would use the actual components)
-        extracted_data = mock_extract_data(file_path)
-        
-        # Generate mock screenshot URL
-        screenshot_url = f"/screenshots/{extraction_id}_screenshot.png"
-        
-        # Create a mock screenshot file
-        create_mock_screenshot(extraction_id)
-        
-        # Return the response
-        return {
-            "status": "ok",
-            "data": extracted_data,
-            "screenshot_url": screenshot_url
-        }
-    
-    except Exception as e:
-        logger.error(f"Error processing form: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
 
-async def save_upload_file(file: UploadFile, file_id: str) -> Path:
+def mock_extract_text(file_path: Path) -> List[Dict[str, Any]]:
     """
-    Save an uploaded file to disk.
+    Mock function to extract text from a file.
     
     Args:
-        file: Uploaded file
-        file_id: Unique ID for the file
+        file_path: Path to the file
         
     Returns:
-        Path to the saved file
+        Empty list, since the mock extractor does not use the text
     """
-    # Determine file extension
-    file_extension = Path(file.filename).suffix if file.filename else ""
-    
-    # Create file path
-    file_path = settings.upload_dir / f"{file_id}{file_extension}"
-    
-    # Save the file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    
-    return file_path
+    return []
 
 
-def mock_extract_data(file_path: Path) -> Dict[str, Any]:
+def mock_extract_data(text_blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Mock function to extract data from a file.
+    Mock function to extract data from text blocks.
     
     Args:
-        file_path: Path to the file
+        text_blocks: List of text blocks with coordinates
         
     Returns:
         Dictionary containing mock extracted data
@@ -195,17 +128,43 @@ def mock_extract_data(file_path: Path) -> Dict[str, Any]:
     }
 
 
-def create_mock_screenshot(extraction_id: str) -> None:
+def mock_validate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mock function to validate extracted data.
+    
+    Args:
+        data: Dictionary containing extracted form data
+        
+    Returns:
+        The data unchanged
+    """
+    return data
+
+
+def create_mock_screenshot(data: Dict[str, Any], extraction_id: str) -> Path:
     """
     Create a mock screenshot file.
     
     Args:
+        data: Dictionary containing form data
         extraction_id: Unique ID for the extraction
+        
+    Returns:
+        Path to the mock screenshot
     """
-    # Create a simple text file as a mock screenshot
-    screenshot_path = settings.screenshot_dir / f"{extraction_id}_screenshot.png"
-    with open(screenshot_path, "w") as f:
-        f.write("This is a mock screenshot file.")
+    # Write a placeholder PNG as the mock screenshot
+    return save_mock_screenshot(settings.screenshot_dir, extraction_id)
+
+
+# Create FastAPI app
+app = create_app(
+    upload_dir=settings.upload_dir,
+    screenshot_dir=settings.screenshot_dir,
+    extract_text=mock_extract_text,
+    extract_fields=mock_extract_data,
+    validate=mock_validate,
+    fill_form=create_mock_screenshot
+)
 
 
 if __name__ == "__main__":
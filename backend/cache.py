@@ -0,0 +1,251 @@
+"""
+Cache module for memoizing expensive pipeline results.
+Provides a thread-safe in-memory LRU cache keyed by content digests, a
+persistent SQLite-backed cache that survives restarts, and a semantic cache
+that matches near-duplicate documents by text similarity.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a fixed number of entries."""
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries to keep (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """Persistent JSON cache stored in a SQLite database."""
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = 30 * 24 * 3600,
+        max_entries: int = 10000,
+        version: str = "",
+        prune_interval: int = 100
+    ):
+        """
+        Initialize the disk cache, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Time in seconds after which entries expire
+            max_entries: Maximum number of entries to keep (oldest are evicted first)
+            version: Version tag; entries written under another version are ignored
+            prune_interval: Number of writes between evictions of expired and excess
+                entries, so the table may briefly hold up to prune_interval - 1 extra rows
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = version
+        self.prune_interval = max(prune_interval, 1)
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection; one per operation keeps the cache thread- and process-safe."""
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up an unexpired cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND version = ? AND created_at >= ?",
+                (key, self.version, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value, evicting expired or excess entries every prune_interval writes.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, version, value, created_at) VALUES (?, ?, ?, ?)",
+                (key, self.version, json.dumps(value), time.time())
+            )
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_interval == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        """Evict expired entries and the oldest entries beyond max_entries."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM cache WHERE key NOT IN "
+                "(SELECT key FROM cache ORDER BY created_at DESC, rowid DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM cache")
+
+
+class SemanticCache:
+    """Cache that returns values stored for textually similar documents."""
+
+    _TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self, maxsize: int = 256, threshold: float = 0.98, dimensions: int = 384):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            maxsize: Maximum number of documents to keep (oldest are replaced first)
+            threshold: Minimum cosine similarity for a cache hit
+            dimensions: Size of the hashed bag-of-words embedding
+        """
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self._vectors = np.zeros((maxsize, dimensions), dtype=np.float32)
+        self._values = [None] * maxsize
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed text as an L2-normalized hashed bag-of-words vector.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Normalized embedding vector
+        """
+        indices = np.fromiter(
+            (zlib.crc32(token.encode()) for token in self._TOKEN_RE.findall(text.lower())),
+            dtype=np.int64
+        ) % self.dimensions
+        vector = np.bincount(indices, minlength=self.dimensions).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, text: str) -> Optional[Any]:
+        """
+        Look up the value stored for the most similar cached document.
+
+        Args:
+            text: Document text
+
+        Returns:
+            The cached value if a document is similar enough, None otherwise
+        """
+        if self._count == 0:
+            return None
+
+        vector = self.embed(text)
+        with self._lock:
+            scores = self._vectors[:self._count] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._values[best]
+        return None
+
+    def set(self, text: str, value: Any) -> None:
+        """
+        Store a value for a document, replacing the oldest entry if full.
+
+        Args:
+            text: Document text
+            value: Value to cache
+        """
+        if self.maxsize <= 0:
+            return
+
+        vector = self.embed(text)
+        with self._lock:
+            self._vectors[self._next] = vector
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self.maxsize
+            self._count = min(self._count + 1, self.maxsize)
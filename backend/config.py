@@ -2,10 +2,12 @@
 Configuration module for the Healthcare Form Data Extraction PoC.
 Loads environment variables from .env file using Pydantic's Settings.
 """
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +20,7 @@ class Settings(BaseSettings):
     # File Paths
     upload_dir: Path = Field(Path("./uploads"), env="UPLOAD_DIR")
     screenshot_dir: Path = Field(Path("./screenshots"), env="SCREENSHOT_DIR")
+    cache_dir: Path = Field(Path("./cache"), env="CACHE_DIR")
     
     # Form URLs
     target_form_url: str = Field("https://example.com/healthcare-form", env="TARGET_FORM_URL")
@@ -26,16 +29,67 @@ class Settings(BaseSettings):
     host: str = Field("0.0.0.0", env="HOST")
     port: int = Field(8001, env="PORT")
     debug: bool = Field(True, env="DEBUG")
+    workers: int = Field(os.cpu_count() or 1, env="WORKERS")
+    
+    # LLM
+    llm_stream: bool = Field(False, env="LLM_STREAM")
+    
+    # OCR
+    ocr_device: str = Field("cpu", env="OCR_DEVICE")
+    ocr_mixed_precision: bool = Field(True, env="OCR_MIXED_PRECISION")
+    
+    # Screenshots
+    screenshot_compress_level: int = Field(9, env="SCREENSHOT_COMPRESS_LEVEL")
+    png_backend: str = Field("pillow", env="PNG_BACKEND")
+    # Unset: the CPUs are shared between the server workers (see set_render_workers)
+    render_workers: Optional[int] = Field(None, env="RENDER_WORKERS")
+    
+    # PDF parsing
+    # Unset: the CPUs are shared between the server workers (see set_pool_workers)
+    pdf_workers: Optional[int] = Field(None, env="PDF_WORKERS")
+    
+    # Caching
+    response_cache_size: int = Field(128, env="RESPONSE_CACHE_SIZE")
+    llm_cache_size: int = Field(1024, env="LLM_CACHE_SIZE")
+    disk_cache_ttl_days: int = Field(30, env="DISK_CACHE_TTL_DAYS")
+    disk_cache_max_entries: int = Field(10000, env="DISK_CACHE_MAX_ENTRIES")
+    disk_cache_prune_interval: int = Field(100, env="DISK_CACHE_PRUNE_INTERVAL")
+    semantic_cache_enabled: bool = Field(False, env="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(0.98, env="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_size: int = Field(256, env="SEMANTIC_CACHE_SIZE")
     
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
+    @model_validator(mode="after")
+    def set_pool_workers(self) -> "Settings":
+        """Split the CPUs between the server workers when RENDER_WORKERS or PDF_WORKERS is not set."""
+        # Each server worker has its own process pools; debug mode runs a single worker
+        server_workers = 1 if self.debug else max(self.workers, 1)
+        cpus_per_worker = max((os.cpu_count() or 1) // server_workers, 1)
+        if self.render_workers is None:
+            self.render_workers = cpus_per_worker
+        if self.pdf_workers is None:
+            self.pdf_workers = cpus_per_worker
+        return self
+
     def initialize_directories(self) -> None:
         """Create necessary directories if they don't exist."""
         self.upload_dir.mkdir(parents=True, exist_ok=True)
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, creating the working directories on first use.
+    
+    Returns:
+        Cached Settings instance
+    """
+    settings = Settings()
+    settings.initialize_directories()
+    return settings
+
+
 # Create a global settings instance
-settings = Settings()
-# Initialize directories
-settings.initialize_directories()
+settings = get_settings()
@@ -0,0 +1,46 @@
+"""
+File type detection module.
+Kept free of heavy dependencies so that uploads can be routed to the right
+parser before PyMuPDF or docTR are imported.
+"""
+from pathlib import Path
+
+
+# File extensions accepted as images
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"})
+
+
+def is_pdf_file(file_path: Path) -> bool:
+    """
+    Check if a file is a PDF based on its extension and content.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        True if the file is a PDF, False otherwise
+    """
+    # Check file extension
+    if file_path.suffix.lower() != ".pdf":
+        return False
+    
+    # Check file content (PDF signature); unbuffered so only the 4 signature
+    # bytes are read instead of filling a default-sized read buffer
+    try:
+        with open(file_path, "rb", buffering=0) as f:
+            return f.read(4) == b"%PDF"
+    except Exception:
+        return False
+
+
+def is_image_file(file_path: Path) -> bool:
+    """
+    Check if a file is an image based on its extension.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        True if the file is an image, False otherwise
+    """
+    return file_path.suffix.lower() in IMAGE_EXTENSIONS
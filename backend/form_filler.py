@@ -2,6 +2,10 @@
 Form filler module for generating visual representations of healthcare forms with extracted data.
 """
 import logging
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 import io
@@ -13,21 +17,150 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    # OSError is raised when the Python binding is installed without libvips
+    PYVIPS_AVAILABLE = False
+
 from config import settings
 
 
+# Number of rendered form canvases kept for reuse per visualizer
+CANVAS_POOL_SIZE = 4
+
+# Layout of form fields: label column, value column and text colors
+LABEL_X = 40
+VALUE_X = LABEL_X + 200
+LABEL_FILL = (100, 100, 100)
+VALUE_FILL = (0, 0, 0)
+
+
+@lru_cache(maxsize=32)
+def _load_font(path: str, size: int) -> "ImageFont.ImageFont":
+    """
+    Load a TrueType font once per (path, size) and reuse it across renders.
+    
+    Args:
+        path: Font file name or path
+        size: Font size in points
+        
+    Returns:
+        The loaded font, or Pillow's default font if it cannot be found
+    """
+    try:
+        return ImageFont.truetype(path, size)
+    except IOError:
+        # Fallback to default font
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=32)
+def _line_height(font: "ImageFont.ImageFont") -> int:
+    """
+    Compute the spacing between lines of text for a font once and reuse it.
+    
+    Args:
+        font: Loaded font
+        
+    Returns:
+        Line height in pixels
+    """
+    # getsize() was removed in Pillow 10; the bottom of the bounding box is its equivalent height
+    if hasattr(font, "getbbox"):
+        return int(font.getbbox("A")[3]) + 5
+    return font.getsize("A")[1] + 5
+
+
 class FormVisualizer:
     """Creates visual representations of healthcare forms with extracted data."""
     
-    def __init__(self, screenshot_dir: Path):
+    def __init__(self, screenshot_dir: Path, compress_level: int = 9, png_backend: str = "pillow"):
         """
         Initialize the form visualizer.
         
         Args:
             screenshot_dir: Directory to save visualizations
+            compress_level: PNG zlib compression level (1 = fastest, 9 = smallest)
+            png_backend: PNG encoder to use, "pillow" or "pyvips" (falls back to Pillow if unavailable)
         """
         self.screenshot_dir = screenshot_dir
+        self.compress_level = compress_level
         self.logger = logging.getLogger(__name__)
+        
+        self.png_backend = png_backend
+        if png_backend == "pyvips" and not PYVIPS_AVAILABLE:
+            self.logger.warning("pyvips not available, saving screenshots with Pillow")
+            self.png_backend = "pillow"
+        self._template = None
+        
+        # Canvases of finished renders, reused to avoid allocating a new image per form
+        self._canvases = queue.Queue(maxsize=CANVAS_POOL_SIZE)
+    
+    def _get_template(self) -> "Image.Image":
+        """
+        Get the blank form with its static chrome, rendering it on first use.
+        
+        The header band, title, first section header and footer never change
+        between forms, so they are drawn once and each form starts from a copy.
+        
+        Returns:
+            Template image (must be copied before drawing on it)
+        """
+        if self._template is None:
+            # Create a blank image
+            width, height = 1000, 1400
+            template = Image.new('RGB', (width, height), color=(255, 255, 255))
+            draw = ImageDraw.Draw(template)
+            
+            title_font = _load_font("arial.ttf", 24)
+            header_font = _load_font("arial.ttf", 18)
+            normal_font = _load_font("arial.ttf", 14)
+            
+            # Draw form header (the form ID is drawn per form)
+            draw.rectangle([(0, 0), (width, 80)], fill=(66, 133, 244))
+            draw.text((20, 20), "HEALTHCARE PATIENT INFORMATION FORM", fill=(255, 255, 255), font=title_font)
+            
+            # Patient Information Section header (always at the same position)
+            self._draw_section_header(draw, "Patient Information", 20, 100, header_font)
+            
+            # Draw footer
+            draw.rectangle([(0, height-40), (width, height)], fill=(240, 240, 240))
+            draw.text((20, height-30), "Generated by Healthcare Form Data Extraction PoC", fill=(100, 100, 100), font=normal_font)
+            
+            self._template = template
+        
+        return self._template
+    
+    def _acquire_canvas(self) -> "Image.Image":
+        """
+        Get an image holding the form chrome to draw a form on.
+        
+        Returns:
+            A pooled canvas reset to the template, or a new copy of the template if none is free
+        """
+        template = self._get_template()
+        try:
+            canvas = self._canvases.get_nowait()
+        except queue.Empty:
+            return template.copy()
+        
+        # Overwrite the previous form in place with the template pixels
+        canvas.paste(template)
+        return canvas
+    
+    def _release_canvas(self, canvas: "Image.Image") -> None:
+        """
+        Return a canvas to the pool once its form has been saved.
+        
+        Args:
+            canvas: Image obtained from _acquire_canvas
+        """
+        try:
+            self._canvases.put_nowait(canvas)
+        except queue.Full:
+            pass
     
     def create_form_visualization(self, data: Dict[str, Any], form_id: str) -> Optional[Path]:
         """
@@ -46,33 +179,24 @@ class FormVisualizer:
         
         screenshot_path = self.screenshot_dir / f"{form_id}_screenshot.png"
         
+        image = None
         try:
-            # Create a blank image
-            width, height = 1000, 1400
-            image = Image.new('RGB', (width, height), color=(255, 255, 255))
+            # Start from the pre-rendered form chrome
+            image = self._acquire_canvas()
             draw = ImageDraw.Draw(image)
             
-            # Try to load fonts
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 24)
-                header_font = ImageFont.truetype("arial.ttf", 18)
-                normal_font = ImageFont.truetype("arial.ttf", 14)
-            except IOError:
-                # Fallback to default font
-                title_font = ImageFont.load_default()
-                header_font = ImageFont.load_default()
-                normal_font = ImageFont.load_default()
-            
-            # Draw form header
-            draw.rectangle([(0, 0), (width, 80)], fill=(66, 133, 244))
-            draw.text((20, 20), "HEALTHCARE PATIENT INFORMATION FORM", fill=(255, 255, 255), font=title_font)
+            # Load fonts and line metrics (cached across renders)
+            header_font = _load_font("arial.ttf", 18)
+            normal_font = _load_font("arial.ttf", 14)
+            line_height = _line_height(normal_font)
+            
+            # Draw form ID in the header
             draw.text((20, 50), f"Form ID: {form_id}", fill=(255, 255, 255), font=normal_font)
             
             # Draw form sections
             y_pos = 100
             
-            # Patient Information Section
-            self._draw_section_header(draw, "Patient Information", 20, y_pos, header_font)
+            # Patient Information Section (header is part of the template)
             y_pos += 30
             
             fields = [
@@ -84,9 +208,7 @@ class FormVisualizer:
                 ("Email:", data.get("email", "N/A"))
             ]
             
-            for label, value in fields:
-                y_pos = self._draw_field(draw, label, str(value), 40, y_pos, normal_font)
-                y_pos += 10
+            y_pos = self._draw_fields(draw, fields, y_pos, normal_font, line_height)
             
             # Insurance Information Section
             y_pos += 20
@@ -98,9 +220,7 @@ class FormVisualizer:
                 ("Insurance ID:", data.get("insurance_id", "N/A"))
             ]
             
-            for label, value in insurance_fields:
-                y_pos = self._draw_field(draw, label, str(value), 40, y_pos, normal_font)
-                y_pos += 10
+            y_pos = self._draw_fields(draw, insurance_fields, y_pos, normal_font, line_height)
             
             # Medical Information Section
             y_pos += 20
@@ -108,15 +228,15 @@ class FormVisualizer:
             y_pos += 30
             
             # Medical History
-            y_pos = self._draw_list_field(draw, "Medical History:", data.get("medical_history", []), 40, y_pos, normal_font)
+            y_pos = self._draw_list_field(draw, "Medical History:", data.get("medical_history", []), 40, y_pos, normal_font, line_height)
             y_pos += 20
             
             # Current Medications
-            y_pos = self._draw_list_field(draw, "Current Medications:", data.get("current_medications", []), 40, y_pos, normal_font)
+            y_pos = self._draw_list_field(draw, "Current Medications:", data.get("current_medications", []), 40, y_pos, normal_font, line_height)
             y_pos += 20
             
             # Allergies
-            y_pos = self._draw_list_field(draw, "Allergies:", data.get("allergies", []), 40, y_pos, normal_font)
+            y_pos = self._draw_list_field(draw, "Allergies:", data.get("allergies", []), 40, y_pos, normal_font, line_height)
             y_pos += 20
             
             # Appointment Information Section
@@ -130,36 +250,84 @@ class FormVisualizer:
                 ("Doctor:", data.get("doctor_name", "N/A"))
             ]
             
-            for label, value in appointment_fields:
-                y_pos = self._draw_field(draw, label, str(value), 40, y_pos, normal_font)
-                y_pos += 10
-            
-            # Draw footer
-            draw.rectangle([(0, height-40), (width, height)], fill=(240, 240, 240))
-            draw.text((20, height-30), "Generated by Healthcare Form Data Extraction PoC", fill=(100, 100, 100), font=normal_font)
+            y_pos = self._draw_fields(draw, appointment_fields, y_pos, normal_font, line_height)
             
             # Save the image
-            image.save(screenshot_path)
+            self._save_png(image, screenshot_path)
             
             return screenshot_path
         
         except Exception as e:
             self.logger.error(f"Error creating form visualization: {str(e)}")
             return self._create_text_fallback(data, form_id)
+        
+        finally:
+            if image is not None:
+                self._release_canvas(image)
+    
+    def _save_png(self, image: "Image.Image", path: Path) -> None:
+        """
+        Encode an RGB image as PNG with the configured backend.
+        
+        Args:
+            image: Rendered form image
+            path: Destination path
+        """
+        if self.png_backend == "pyvips":
+            # libvips has a considerably faster DEFLATE path than Pillow's encoder
+            vips_image = pyvips.Image.new_from_memory(image.tobytes(), image.width, image.height, 3, "uchar")
+            vips_image.pngsave(str(path), compression=self.compress_level)
+            return
+        
+        # The large flat-colour areas compress very well, and at the highest
+        # level Pillow also searches for the smallest filter settings
+        image.save(
+            path,
+            format="PNG",
+            optimize=self.compress_level >= 9,
+            compress_level=self.compress_level
+        )
     
     def _draw_section_header(self, draw, text, x, y, font):
         """Draw a section header with a line underneath."""
         draw.text((x, y), text, fill=(66, 133, 244), font=font)
         draw.line([(x, y + 25), (x + 500, y + 25)], fill=(200, 200, 200), width=1)
     
-    def _draw_field(self, draw, label, value, x, y, font):
+    def _draw_fields(self, draw, fields, y, font, line_height):
+        """
+        Draw consecutive label/value fields, each followed by a 10px gap.
+        
+        Single-line values, by far the most common, are drawn inline with the bound
+        draw.text method; only multiline values go through _draw_field.
+        
+        Args:
+            draw: ImageDraw of the form
+            fields: Sequence of (label, value) pairs
+            y: Vertical position of the first field
+            font: Font for labels and values
+            line_height: Spacing between lines of multiline values
+            
+        Returns:
+            Vertical position after the last field
+        """
+        draw_text = draw.text
+        for label, value in fields:
+            value = str(value)
+            if "\n" in value:
+                y = self._draw_field(draw, label, value, LABEL_X, y, font, line_height) + 10
+            else:
+                draw_text((LABEL_X, y), label, fill=LABEL_FILL, font=font)
+                draw_text((VALUE_X, y), value, fill=VALUE_FILL, font=font)
+                y += 35
+        return y
+    
+    def _draw_field(self, draw, label, value, x, y, font, line_height):
         """Draw a field with label and value."""
         draw.text((x, y), label, fill=(100, 100, 100), font=font)
         
         # Handle multiline values
         if "\n" in value:
             lines = value.split("\n")
-            line_height = font.getsize("A")[1] + 5
             for i, line in enumerate(lines):
                 draw.text((x + 200, y + (i * line_height)), line, fill=(0, 0, 0), font=font)
             return y + (len(lines) * line_height)
@@ -167,7 +335,7 @@ class FormVisualizer:
             draw.text((x + 200, y), value, fill=(0, 0, 0), font=font)
             return y + 25
     
-    def _draw_list_field(self, draw, label, values, x, y, font):
+    def _draw_list_field(self, draw, label, values, x, y, font, line_height):
         """Draw a field with a list of values."""
         draw.text((x, y), label, fill=(100, 100, 100), font=font)
         
@@ -175,7 +343,6 @@ class FormVisualizer:
             draw.text((x + 200, y), "None", fill=(0, 0, 0), font=font)
             return y + 25
         
-        line_height = font.getsize("A")[1] + 5
         for i, value in enumerate(values):
             draw.text((x + 200, y + (i * line_height)), f"• {value}", fill=(0, 0, 0), font=font)
         
@@ -186,42 +353,50 @@ class FormVisualizer:
         screenshot_path = self.screenshot_dir / f"{form_id}_screenshot.txt"
         
         try:
-            with open(screenshot_path, "w") as f:
-                f.write(f"HEALTHCARE FORM DATA - ID: {form_id}\n\n")
+            lines = [
+                f"HEALTHCARE FORM DATA - ID: {form_id}",
+                "",
                 
                 # Patient Information
-                f.write("PATIENT INFORMATION\n")
-                f.write(f"Patient Name: {data.get('patient_name', 'N/A')}\n")
-                f.write(f"Date of Birth: {data.get('date_of_birth', 'N/A')}\n")
-                f.write(f"Gender: {data.get('gender', 'N/A')}\n")
-                f.write(f"Address: {data.get('address', 'N/A')}\n")
-                f.write(f"Phone Number: {data.get('phone_number', 'N/A')}\n")
-                f.write(f"Email: {data.get('email', 'N/A')}\n\n")
+                "PATIENT INFORMATION",
+                f"Patient Name: {data.get('patient_name', 'N/A')}",
+                f"Date of Birth: {data.get('date_of_birth', 'N/A')}",
+                f"Gender: {data.get('gender', 'N/A')}",
+                f"Address: {data.get('address', 'N/A')}",
+                f"Phone Number: {data.get('phone_number', 'N/A')}",
+                f"Email: {data.get('email', 'N/A')}",
+                "",
                 
                 # Insurance Information
-                f.write("INSURANCE INFORMATION\n")
-                f.write(f"Insurance Provider: {data.get('insurance_provider', 'N/A')}\n")
-                f.write(f"Insurance ID: {data.get('insurance_id', 'N/A')}\n\n")
+                "INSURANCE INFORMATION",
+                f"Insurance Provider: {data.get('insurance_provider', 'N/A')}",
+                f"Insurance ID: {data.get('insurance_id', 'N/A')}",
+                "",
                 
                 # Medical Information
-                f.write("MEDICAL INFORMATION\n")
-                f.write("Medical History:\n")
-                for item in data.get('medical_history', []):
-                    f.write(f"- {item}\n")
-                
-                f.write("\nCurrent Medications:\n")
-                for item in data.get('current_medications', []):
-                    f.write(f"- {item}\n")
-                
-                f.write("\nAllergies:\n")
-                for item in data.get('allergies', []):
-                    f.write(f"- {item}\n")
-                
-                # Appointment Information
-                f.write("\nAPPOINTMENT INFORMATION\n")
-                f.write(f"Primary Complaint: {data.get('primary_complaint', 'N/A')}\n")
-                f.write(f"Appointment Date: {data.get('appointment_date', 'N/A')}\n")
-                f.write(f"Doctor: {data.get('doctor_name', 'N/A')}\n")
+                "MEDICAL INFORMATION",
+                "Medical History:"
+            ]
+            lines.extend(f"- {item}" for item in data.get('medical_history', []))
+            
+            lines.extend(["", "Current Medications:"])
+            lines.extend(f"- {item}" for item in data.get('current_medications', []))
+            
+            lines.extend(["", "Allergies:"])
+            lines.extend(f"- {item}" for item in data.get('allergies', []))
+            
+            # Appointment Information
+            lines.extend([
+                "",
+                "APPOINTMENT INFORMATION",
+                f"Primary Complaint: {data.get('primary_complaint', 'N/A')}",
+                f"Appointment Date: {data.get('appointment_date', 'N/A')}",
+                f"Doctor: {data.get('doctor_name', 'N/A')}",
+                ""
+            ])
+            
+            # Write the whole document at once
+            screenshot_path.write_text("\n".join(lines), encoding="utf-8")
             
             return screenshot_path
         
@@ -231,7 +406,11 @@ class FormVisualizer:
 
 
 # Create a singleton instance
-form_visualizer = FormVisualizer(screenshot_dir=settings.screenshot_dir)
+form_visualizer = FormVisualizer(
+    screenshot_dir=settings.screenshot_dir,
+    compress_level=settings.screenshot_compress_level,
+    png_backend=settings.png_backend
+)
 
 
 def fill_form(data: Dict[str, Any], form_id: str) -> Optional[Path]:
@@ -246,3 +425,41 @@ def fill_form(data: Dict[str, Any], form_id: str) -> Optional[Path]:
         Path to the visualization if successful, None otherwise
     """
     return form_visualizer.create_form_visualization(data, form_id)
+
+
+# Process pool for rendering forms on multiple cores (created on first use);
+# each worker process builds its own visualizer, fonts and template. Workers are
+# spawned rather than forked, as the server process runs threads.
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared form rendering pool, creating it if needed."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.render_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _render_pool
+
+
+def fill_form_in_pool(data: Dict[str, Any], form_id: str) -> Optional[Path]:
+    """
+    Create a form visualization in the rendering process pool.
+    
+    The drawing code is mostly Python and holds the GIL, so concurrent requests
+    only render in parallel when each form is drawn in its own process. Blocks
+    until the form is rendered; rendering happens in-process if the pool is
+    disabled (RENDER_WORKERS=0).
+    
+    Args:
+        data: Dictionary containing form data
+        form_id: Unique identifier for the form
+        
+    Returns:
+        Path to the visualization if successful, None otherwise
+    """
+    if settings.render_workers <= 0:
+        return fill_form(data, form_id)
+    return _get_render_pool().submit(fill_form, data, form_id).result()
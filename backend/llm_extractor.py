@@ -1,13 +1,91 @@
 """
 LLM extractor module for extracting structured data from text using Groq's Llama-3.1 model.
 """
-import json
-from typing import Dict, Any, List, Optional
+import hashlib
+import logging
+import re
+from typing import Dict, Any, Iterable, List, Optional, Union
 
 import groq
+import numpy as np
+import orjson
 from pydantic import BaseModel, Field
 
+from cache import LRUCache, SemanticCache
 from config import settings
+from text_blocks import TextBlocks
+
+
+logger = logging.getLogger(__name__)
+
+# Static prompt prefix shared by every request. It must stay byte-for-byte identical
+# between calls (no timestamps, IDs or per-request data) so the provider can reuse
+# its cached prefix computation; only the document text varies per request.
+SYSTEM_PROMPT = """
+# Your Purpose
+You are a healthcare form data extraction assistant. Your task is to extract specific fields from healthcare form text and return them in a structured JSON format.
+
+# Instructions
+1. Carefully analyze the provided healthcare form text.
+2. Extract all requested fields accurately.
+3. For fields not explicitly found in the text, use reasonable inference based on context.
+4. For list fields (medical_history, current_medications, allergies), separate items properly.
+5. Format dates in YYYY-MM-DD format when possible.
+6. Return ONLY the JSON object without any additional text, explanations, or markdown formatting.
+
+# Output Format
+Your response must be a valid JSON object containing exactly these fields:
+{
+  "patient_name": "Full name of the patient",
+  "date_of_birth": "Patient's date of birth (YYYY-MM-DD)",
+  "gender": "Patient's gender",
+  "address": "Patient's full address",
+  "phone_number": "Patient's phone number",
+  "email": "Patient's email address (or null if not available)",
+  "insurance_provider": "Name of the insurance provider",
+  "insurance_id": "Insurance ID or policy number",
+  "medical_history": ["List of medical history items"],
+  "current_medications": ["List of current medications"],
+  "allergies": ["List of allergies"],
+  "primary_complaint": "Patient's primary complaint or reason for visit",
+  "appointment_date": "Date of appointment (YYYY-MM-DD or null if not available)",
+  "doctor_name": "Name of the doctor (or null if not available)"
+}
+"""
+
+USER_PROMPT_PREFIX = "Extract the healthcare form data from the following text:\n\n"
+
+# Appended after the document text when the regex pre-pass already read some fields,
+# so the model does not spend output tokens on them; it comes last to keep the
+# prompt prefix identical between requests
+KNOWN_FIELDS_SUFFIX = "\n\nThese fields were already extracted, set them to null: {fields}"
+
+# Patterns for fields that can be read reliably without the LLM: a value directly
+# following its label. The first capture group is the field value.
+REGEX_FIELDS = {
+    "email": re.compile(r"(?i)\be-?mail\s*:\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b"),
+    "phone_number": re.compile(r"(?i)\bphone(?:\s*(?:number|no\.?))?\s*:?\s*(\(?\d{3}\)?[-. ]?\d{3}[-. ]?\d{4})\b"),
+    "date_of_birth": re.compile(r"(?i)\b(?:date\s+of\s+birth|dob)\s*:?\s*(\d{4}-\d{2}-\d{2})\b"),
+    "insurance_id": re.compile(r"(?i)\b(?:insurance|policy|member)\s*(?:id|no|number)\b\.?\s*[:#]?\s*((?=[A-Z0-9-]*\d)[A-Z0-9][A-Z0-9-]{4,})\b"),
+}
+
+# Fields returned when extraction fails, with string values for the required fields
+FALLBACK_DATA = {
+    "patient_name": "Unable to extract - API error",
+    "date_of_birth": "Unknown",
+    "gender": "Unknown",
+    "address": "Unable to extract - API error",
+    "phone_number": "Unknown",
+    "email": None,
+    "insurance_provider": "Unknown",
+    "insurance_id": "Unknown",
+    "medical_history": [],
+    "current_medications": [],
+    "allergies": [],
+    "primary_complaint": "Error in extraction",
+    "appointment_date": None,
+    "doctor_name": None
+}
 
 
 class HealthcareFormFields(BaseModel):
@@ -40,13 +118,25 @@ class LLMExtractor:
         """
         self.client = groq.Client(api_key=api_key)
         self.model = "llama-3.1-70b-instant"  # Using the latest Llama-3.1 70B model
+        self.stream = settings.llm_stream
+        
+        # Cache of extractions keyed by a hash of the exact prompt
+        self.completion_cache = LRUCache(maxsize=settings.llm_cache_size)
+        
+        # Optional cache of extractions for near-duplicate documents
+        self.semantic_cache = None
+        if settings.semantic_cache_enabled:
+            self.semantic_cache = SemanticCache(
+                maxsize=settings.semantic_cache_size,
+                threshold=settings.semantic_cache_threshold
+            )
     
-    def extract_fields(self, text_blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def extract_fields(self, text_blocks: Union[TextBlocks, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
         Extract structured fields from text blocks using LLM.
         
         Args:
-            text_blocks: List of text blocks with coordinates
+            text_blocks: Text blocks with coordinates, as TextBlocks or a list of dictionaries
             
         Returns:
             Dictionary containing extracted fields
@@ -54,55 +144,32 @@ class LLMExtractor:
         # Combine all text blocks into a single string
         combined_text = self._combine_text_blocks(text_blocks)
         
-        # Create system message for extraction
-        system_message = """
-        # Your Purpose
-        You are a healthcare form data extraction assistant. Your task is to extract specific fields from healthcare form text and return them in a structured JSON format.
-
-        # Instructions
-        1. Carefully analyze the provided healthcare form text.
-        2. Extract all requested fields accurately.
-        3. For fields not explicitly found in the text, use reasonable inference based on context.
-        4. For list fields (medical_history, current_medications, allergies), separate items properly.
-        5. Format dates in YYYY-MM-DD format when possible.
-        6. Return ONLY the JSON object without any additional text, explanations, or markdown formatting.
-
-        # Output Format
-        Your response must be a valid JSON object containing exactly these fields:
-        {
-          "patient_name": "Full name of the patient",
-          "date_of_birth": "Patient's date of birth (YYYY-MM-DD)",
-          "gender": "Patient's gender",
-          "address": "Patient's full address",
-          "phone_number": "Patient's phone number",
-          "email": "Patient's email address (or null if not available)",
-          "insurance_provider": "Name of the insurance provider",
-          "insurance_id": "Insurance ID or policy number",
-          "medical_history": ["List of medical history items"],
-          "current_medications": ["List of current medications"],
-          "allergies": ["List of allergies"],
-          "primary_complaint": "Patient's primary complaint or reason for visit",
-          "appointment_date": "Date of appointment (YYYY-MM-DD or null if not available)",
-          "doctor_name": "Name of the doctor (or null if not available)"
-        }
-        """
+        # Reuse the extraction of an identical document text if one is cached
+        cache_key = self._cache_key(combined_text)
+        cached_data = self.completion_cache.get(cache_key)
+        if cached_data is not None:
+            logger.info("Returning cached extraction for an identical document text")
+            return dict(cached_data)
+        
+        # Reuse the extraction of a near-identical document if one is cached
+        if self.semantic_cache is not None:
+            cached_data = self.semantic_cache.get(combined_text)
+            if cached_data is not None:
+                logger.info("Returning cached extraction for a near-duplicate document")
+                return dict(cached_data)
+        
+        # Read the trivially structured fields directly from the text
+        regex_data = self._regex_prepass(combined_text)
         
-        # Call Groq API with JSON mode enabled
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": f"Extract the healthcare form data from the following text:\n\n{combined_text}"}
-                ],
-                response_format={"type": "json_object"},  # Enable JSON mode
-                temperature=0.1,  # Low temperature for more deterministic results
-                max_tokens=2048
-            )
-            
             # Parse JSON directly from response
-            json_str = response.choices[0].message.content
-            extracted_data = json.loads(json_str)
+            json_str = self._complete(combined_text, regex_data)
+            extracted_data = orjson.loads(json_str)
+            
+            # Fill fields the LLM could not find from the regex pre-pass
+            for field, value in regex_data.items():
+                if extracted_data.get(field) in (None, "", "Unknown"):
+                    extracted_data[field] = value
             
             # Ensure required fields have string values
             required_fields = ['patient_name', 'date_of_birth', 'gender', 'address', 
@@ -120,68 +187,180 @@ class LLMExtractor:
                     extracted_data[field] = []
             
             # Validate against our schema
-            validated_data = HealthcareFormFields(**extracted_data).dict()
+            validated_data = HealthcareFormFields.model_validate(extracted_data).model_dump()
+            
+            # Only successful extractions are cached, never the error fallback
+            self.completion_cache.set(cache_key, dict(validated_data))
+            if self.semantic_cache is not None:
+                self.semantic_cache.set(combined_text, dict(validated_data))
+            
             return validated_data
             
         except Exception as e:
             # If extraction fails, log the error and return a structured error response
-            import logging
-            logging.error(f"LLM extraction failed: {str(e)}")
-            
-            # Get sample text from the input to use in the fallback
-            sample_text = ""
-            if text_blocks and len(text_blocks) > 0:
-                sample_text = " ".join([block.get("text", "") for block in text_blocks[:5]])
-                if len(sample_text) > 50:
-                    sample_text = sample_text[:50] + "..."
-            
-            # Return a fallback structure with string values for required fields
-            return {
-                "patient_name": "Unable to extract - API error",
-                "date_of_birth": "Unknown",
-                "gender": "Unknown",
-                "address": "Unable to extract - API error",
-                "phone_number": "Unknown",
-                "email": None,
-                "insurance_provider": "Unknown",
-                "insurance_id": "Unknown",
-                "medical_history": [],
-                "current_medications": [],
-                "allergies": [],
-                "primary_complaint": f"Error in extraction: {str(e)}. Sample text: {sample_text}",
-                "appointment_date": None,
-                "doctor_name": None
-            }
+            logger.error(f"LLM extraction failed: {str(e)}")
+            
+            # Get sample text from the first few blocks to use in the fallback
+            if isinstance(text_blocks, TextBlocks):
+                sample_text = " ".join(text_blocks.text[:5])
+            else:
+                sample_text = " ".join(block.get("text", "") for block in text_blocks[:5])
+            if len(sample_text) > 50:
+                sample_text = sample_text[:50] + "..."
+            
+            # Return the fallback structure with fresh lists and the error details,
+            # keeping whatever the regex pre-pass could read
+            fallback_data = dict(
+                FALLBACK_DATA,
+                medical_history=[],
+                current_medications=[],
+                allergies=[],
+                primary_complaint=f"Error in extraction: {str(e)}. Sample text: {sample_text}"
+            )
+            fallback_data.update(regex_data)
+            return fallback_data
+    
+    def _cache_key(self, combined_text: str) -> str:
+        """
+        Hash everything that determines the LLM response: model, prompts and document text.
+        
+        Args:
+            combined_text: Combined text of the document
+            
+        Returns:
+            Hex digest identifying the completion
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.model, SYSTEM_PROMPT, USER_PROMPT_PREFIX, combined_text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _regex_prepass(self, combined_text: str) -> Dict[str, str]:
+        """
+        Extract the fields that follow a fixed format with precompiled regular expressions.
+        
+        The model is asked to leave these fields null (after the document text, so
+        the prompt keeps its cacheable prefix); the values found here fill them in
+        the LLM output and in the error fallback.
+        
+        Args:
+            combined_text: Combined text of the document
+            
+        Returns:
+            Dictionary of the fields found, keyed by field name
+        """
+        found = {}
+        for field, pattern in REGEX_FIELDS.items():
+            match = pattern.search(combined_text)
+            if match:
+                found[field] = match.group(1)
+        return found
     
-    def _combine_text_blocks(self, text_blocks: List[Dict[str, Any]]) -> str:
+    def _complete(self, combined_text: str, known_fields: Iterable[str] = ()) -> str:
+        """
+        Send the document text to the LLM and return the raw JSON response.
+        
+        The static system prompt and user prefix come first so consecutive requests
+        share an identical prompt prefix that the provider can serve from its cache.
+        With LLM_STREAM enabled the completion is read chunk by chunk as it is generated.
+        
+        Args:
+            combined_text: Combined text of the document
+            known_fields: Fields already read by the regex pre-pass, which the model
+                is asked to leave null
+            
+        Returns:
+            JSON string returned by the model
+        """
+        # Call Groq API with JSON mode enabled
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self._user_prompt(combined_text, known_fields)}
+            ],
+            response_format={"type": "json_object"},  # Enable JSON mode
+            temperature=0.1,  # Low temperature for more deterministic results
+            max_tokens=2048,
+            stream=self.stream
+        )
+        
+        # Collect streamed chunks as they arrive instead of waiting for the whole completion
+        if self.stream:
+            parts = []
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+            return "".join(parts)
+        
+        # Report how much of the prompt was served from the provider's prefix cache
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if cached_tokens is not None:
+            logger.debug(f"LLM prompt cache: {cached_tokens}/{usage.prompt_tokens} prompt tokens cached")
+        
+        return response.choices[0].message.content
+    
+    def _user_prompt(self, combined_text: str, known_fields: Iterable[str] = ()) -> str:
+        """
+        Build the user message for a document.
+        
+        Args:
+            combined_text: Combined text of the document
+            known_fields: Fields the model is asked to leave null
+            
+        Returns:
+            User message content
+        """
+        known_fields = list(known_fields)
+        if not known_fields:
+            return USER_PROMPT_PREFIX + combined_text
+        return USER_PROMPT_PREFIX + combined_text + KNOWN_FIELDS_SUFFIX.format(fields=", ".join(known_fields))
+    
+    def _combine_text_blocks(self, text_blocks: Union[TextBlocks, List[Dict[str, Any]]]) -> str:
         """
         Combine text blocks into a single string, sorted by position.
         
         Args:
-            text_blocks: List of text blocks with coordinates
+            text_blocks: Text blocks with coordinates, as TextBlocks (PDFs) or a list of dictionaries (OCR)
             
         Returns:
             Combined text string
         """
-        # Sort blocks by page, then y-coordinate (top to bottom), then x-coordinate (left to right)
-        sorted_blocks = sorted(
-            text_blocks,
-            key=lambda block: (block.get("page", 0), block.get("y0", 0), block.get("x0", 0))
-        )
+        if isinstance(text_blocks, TextBlocks):
+            # The columnar blocks already provide the sorted order
+            texts = text_blocks.text
+            pages = text_blocks.page.tolist()
+            order = text_blocks.reading_order()
+        else:
+            # Gather the sort keys into parallel arrays
+            count = len(text_blocks)
+            texts = [block["text"] for block in text_blocks]
+            pages = [block.get("page", 0) for block in text_blocks]
+            y0 = np.fromiter((block.get("y0", 0) for block in text_blocks), dtype=np.float64, count=count)
+            x0 = np.fromiter((block.get("x0", 0) for block in text_blocks), dtype=np.float64, count=count)
+            
+            # Sort blocks by page, then y-coordinate (top to bottom), then x-coordinate (left to right);
+            # lexsort is stable, so ties keep their input order as with sorted()
+            order = np.lexsort((x0, y0, np.asarray(pages, dtype=np.int32)))
         
-        # Combine text with page and position information for better context
-        result_text = ""
+        # Combine text with page and position information for better context,
+        # collecting the pieces in a list and joining them once
+        parts = []
         current_page = None
         
-        for block in sorted_blocks:
-            page = block.get("page", 0)
+        for i in order.tolist():
+            page = pages[i]
             if page != current_page:
-                result_text += f"\n--- PAGE {page} ---\n"
+                parts.append(f"\n--- PAGE {page} ---\n")
                 current_page = page
             
-            result_text += block["text"] + " "
+            parts.append(texts[i])
+            parts.append(" ")
         
-        return result_text
+        return "".join(parts)
 
 
 # Create a singleton instance
@@ -1,22 +1,59 @@
 """
 OCR parser module for extracting text from images using docTR.
 """
+import logging
+import threading
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import numpy as np
 from PIL import Image
 from doctr.io import DocumentFile
 from doctr.models import ocr_predictor
 
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    # docTR can also run on its TensorFlow backend
+    TORCH_AVAILABLE = False
+
+from config import settings
+from file_types import is_image_file
+
+
+logger = logging.getLogger(__name__)
+
 
 class OCRParser:
     """OCR Parser using docTR for high-accuracy text extraction from images."""
     
-    def __init__(self):
-        """Initialize the OCR predictor with a pre-trained model."""
+    def __init__(self, device: str = "cpu", mixed_precision: bool = True):
+        """
+        Initialize the OCR predictor with a pre-trained model.
+        
+        Args:
+            device: Device to run the models on, e.g. "cpu" or "cuda"
+            mixed_precision: Run inference in float16 when on a CUDA device
+        """
         # Use db_resnet50 for high accuracy OCR
         self.predictor = ocr_predictor(pretrained=True, detect_arch="db_resnet50")
+        
+        # Fall back to the CPU if CUDA was requested but is not available
+        if device.startswith("cuda") and not (TORCH_AVAILABLE and torch.cuda.is_available()):
+            logger.warning("CUDA not available, running OCR on the CPU")
+            device = "cpu"
+        self.device = device
+        self.mixed_precision = mixed_precision and device.startswith("cuda")
+        
+        # Move the detection and recognition models to the GPU if requested
+        if device != "cpu":
+            self.predictor = self.predictor.to(device)
+        
+        # Let cuDNN pick the fastest convolution algorithms for the input shapes seen
+        if device.startswith("cuda"):
+            torch.backends.cudnn.benchmark = True
     
     def extract_text_from_image(self, file_path: Path) -> List[Dict[str, Any]]:
         """
@@ -28,68 +65,105 @@ class OCRParser:
         Returns:
             List of dictionaries containing text blocks with coordinates
         """
-        if not file_path.exists():
-            raise FileNotFoundError(f"Image file not found: {file_path}")
+        return self.extract_text_from_images([file_path])[0]
+    
+    def extract_text_from_images(self, file_paths: List[Path]) -> List[List[Dict[str, Any]]]:
+        """
+        Extract text from several image files with a single batched OCR pass.
         
-        # Load the document
-        doc = DocumentFile.from_images(str(file_path))
+        Args:
+            file_paths: Paths to the image files
+            
+        Returns:
+            One list of text blocks with coordinates per image, in input order
+        """
+        for file_path in file_paths:
+            if not file_path.exists():
+                raise FileNotFoundError(f"Image file not found: {file_path}")
+        
+        # Load all images as the pages of one document
+        doc = DocumentFile.from_images([str(file_path) for file_path in file_paths])
+        
+        # Run OCR prediction once for the whole batch
+        result = self._predict(doc)
+        
+        # Get each image size once to convert normalized coordinates to pixels
+        sizes = []
+        for file_path in file_paths:
+            with Image.open(file_path) as img:
+                sizes.append(img.size)
         
-        # Run OCR prediction
-        result = self.predictor(doc)
+        # Collect every word with the index of its image and its normalized geometry
+        words, image_indices, geometries = [], [], []
+        for image_idx, page in enumerate(result.pages):
+            for block in page.blocks:
+                for line in block.lines:
+                    for word in line.words:
+                        (gx0, gy0), (gx1, gy1) = word.geometry
+                        words.append(word)
+                        image_indices.append(image_idx)
+                        geometries.append((gx0, gy0, gx1, gy1))
         
-        # Extract text with layout information
-        extracted_blocks = []
+        # Convert all coordinates to pixels in a single vectorized step
+        word_sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)[np.asarray(image_indices, dtype=np.intp)]
+        scale = np.tile(word_sizes, 2)  # width, height, width, height per word
+        coords = (np.asarray(geometries, dtype=np.float64).reshape(-1, 4) * scale).astype(np.int32)
         
-        # Process each page
-        for page_idx, page in enumerate(result.pages):
-            # Process each block
-            for block_idx, block in enumerate(page.blocks):
-                # Process each line
-                for line_idx, line in enumerate(block.lines):
-                    # Process each word
-                    for word_idx, word in enumerate(line.words):
-                        # Get coordinates (normalized)
-                        coords = word.geometry
-                        
-                        # Convert to pixel coordinates (assuming standard image size)
-                        # For more accurate conversion, we would need the actual image dimensions
-                        img = Image.open(file_path)
-                        width, height = img.size
-                        
-                        x0 = int(coords[0][0] * width)
-                        y0 = int(coords[0][1] * height)
-                        x1 = int(coords[1][0] * width)
-                        y1 = int(coords[1][1] * height)
-                        
-                        # Create text block
-                        text_block = {
-                            "text": word.value,
-                            "page": page_idx + 1,
-                            "x0": x0,
-                            "y0": y0,
-                            "x1": x1,
-                            "y1": y1,
-                            "confidence": float(word.confidence)
-                        }
-                        
-                        extracted_blocks.append(text_block)
+        # Create text blocks with layout information, grouped by image
+        extracted_blocks = [[] for _ in file_paths]
+        for word, image_idx, (x0, y0, x1, y1) in zip(words, image_indices, coords.tolist()):
+            extracted_blocks[image_idx].append({
+                "text": word.value,
+                "page": 1,
+                "x0": x0,
+                "y0": y0,
+                "x1": x1,
+                "y1": y1,
+                "confidence": float(word.confidence)
+            })
         
         return extracted_blocks
+    
+    def _predict(self, doc: List[np.ndarray]) -> Any:
+        """
+        Run the OCR predictor without autograd, in float16 autocast when enabled.
+        
+        Args:
+            doc: Loaded pages
+            
+        Returns:
+            docTR document result
+        """
+        if not TORCH_AVAILABLE:
+            return self.predictor(doc)
+        
+        autocast = torch.autocast("cuda", dtype=torch.float16) if self.mixed_precision else nullcontext()
+        with torch.inference_mode(), autocast:
+            return self.predictor(doc)
 
 
-def is_image_file(file_path: Path) -> bool:
+# Shared instance, created on first use since loading the models is slow
+_ocr_parser: Optional[OCRParser] = None
+_ocr_parser_lock = threading.Lock()
+
+
+def get_ocr_parser() -> OCRParser:
     """
-    Check if a file is an image based on its extension.
+    Get the shared OCR parser, loading the models on first use.
     
-    Args:
-        file_path: Path to the file
-        
     Returns:
-        True if the file is an image, False otherwise
+        OCRParser instance
     """
-    image_extensions = [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]
-    return file_path.suffix.lower() in image_extensions
+    global _ocr_parser
+    if _ocr_parser is None:
+        with _ocr_parser_lock:
+            if _ocr_parser is None:
+                _ocr_parser = OCRParser(device=settings.ocr_device, mixed_precision=settings.ocr_mixed_precision)
+    return _ocr_parser
 
 
-# Create a singleton instance
-ocr_parser = OCRParser()
+def __getattr__(name: str) -> Any:
+    """Resolve the legacy ocr_parser singleton lazily."""
+    if name == "ocr_parser":
+        return get_ocr_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,80 +2,138 @@
 PDF parser module for extracting text with layout information from PDF files.
 Uses PyMuPDF (fitz) to extract text blocks with their coordinates.
 """
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 import fitz  # PyMuPDF
 
+from config import settings
+from file_types import is_pdf_file
+from text_blocks import TextBlocks
 
-def extract_text_with_layout(file_path: Path) -> List[Dict[str, Any]]:
+
+# Text extraction flags: text only (no images), without preserving ligatures
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES
+
+
+# Documents with at least this many pages are parsed page by page in the process pool
+POOL_MIN_PAGES = 4
+
+# Process pool for parsing PDF pages in parallel (created on first use). PyMuPDF is
+# not thread-safe, so pages are parsed in separate processes rather than threads.
+# Workers are spawned rather than forked, as the server process runs threads.
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the shared PDF parsing pool, creating it if needed."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=settings.pdf_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def _extract_page_columns(page: Any, page_num: int) -> Tuple[list, list, list, list, list, list]:
     """
-    Extract text from a PDF file with layout information.
+    Extract the text spans of a single PDF page as column lists.
+    
+    Args:
+        page: PyMuPDF page object
+        page_num: 1-based page number
+        
+    Returns:
+        Tuple of text, bbox, page, size, font and color lists
+    """
+    texts, bboxes, sizes, fonts, colors = [], [], [], [], []
+    
+    # Extract text spans with coordinates; TEXTFLAGS_TEXT skips image blocks
+    # so their pixel data is never decoded, and ligatures are expanded to plain characters
+    blocks = page.get_text("dict", flags=PDF_TEXT_FLAGS)["blocks"]
+    
+    # Flatten blocks -> lines -> spans into one entry per span
+    for block in blocks:
+        for line in block.get("lines", ()):
+            for span in line.get("spans", ()):
+                # Whitespace-only spans carry no information for extraction
+                if not span["text"].strip():
+                    continue
+                texts.append(span["text"])
+                bboxes.append(span["bbox"])
+                sizes.append(span.get("size", 0))
+                fonts.append(span.get("font", ""))
+                colors.append(span.get("color", 0))
+    
+    return texts, bboxes, [page_num] * len(texts), sizes, fonts, colors
+
+
+def _parse_page(args: Tuple[str, int]) -> Tuple[list, list, list, list, list, list]:
+    """
+    Extract the text spans of one page of a PDF file in a worker process.
+    
+    Args:
+        args: Tuple of the PDF file path and zero-based page index
+        
+    Returns:
+        Tuple of text, bbox, page, size, font and color lists
+    """
+    path, page_index = args
+    with fitz.open(path) as doc:
+        return _extract_page_columns(doc[page_index], page_index + 1)
+
+
+def extract_text_blocks(file_path: Path) -> TextBlocks:
+    """
+    Extract text from a PDF file with layout information as parallel arrays.
     
     Args:
         file_path: Path to the PDF file
         
     Returns:
-        List of dictionaries containing text blocks with coordinates
+        TextBlocks holding the text, coordinates and font attributes of every span
     """
     if not file_path.exists():
         raise FileNotFoundError(f"PDF file not found: {file_path}")
     
     # Open the PDF file
     doc = fitz.open(file_path)
+    page_count = len(doc)
     
-    # List to store all text blocks from all pages
-    all_blocks = []
-    
-    # Process each page
-    for page_num, page in enumerate(doc):
-        # Extract text with dict format to get blocks with coordinates
-        blocks = page.get_text("dict")["blocks"]
-        
-        # Process each block
-        for block in blocks:
-            if "lines" in block:
-                for line in block["lines"]:
-                    if "spans" in line:
-                        for span in line["spans"]:
-                            # Extract text and position data
-                            text_block = {
-                                "text": span["text"],
-                                "page": page_num + 1,
-                                "x0": span["bbox"][0],
-                                "y0": span["bbox"][1],
-                                "x1": span["bbox"][2],
-                                "y1": span["bbox"][3],
-                                "font": span.get("font", ""),
-                                "size": span.get("size", 0),
-                                "color": span.get("color", 0)
-                            }
-                            all_blocks.append(text_block)
+    # Short documents are parsed in-process, where pool overhead would dominate;
+    # so is every document when the pool is disabled (PDF_WORKERS=0)
+    use_pool = settings.pdf_workers > 0 and page_count >= POOL_MIN_PAGES
+    page_columns = [] if use_pool else [
+        _extract_page_columns(page, page_num) for page_num, page in enumerate(doc, start=1)
+    ]
     
     # Close the document
     doc.close()
     
-    return all_blocks
+    # Parse long documents page by page in the process pool
+    if use_pool:
+        page_columns = _get_pdf_pool().map(_parse_page, [(str(file_path), i) for i in range(page_count)])
+    
+    # Concatenate the columns of all pages, in page order
+    columns = ([], [], [], [], [], [])
+    for page_column in page_columns:
+        for column, values in zip(columns, page_column):
+            column.extend(values)
+    
+    return TextBlocks.from_lists(*columns)
 
 
-def is_pdf_file(file_path: Path) -> bool:
+def extract_text_with_layout(file_path: Path) -> List[Dict[str, Any]]:
     """
-    Check if a file is a PDF based on its extension and content.
+    Extract text from a PDF file with layout information.
     
     Args:
-        file_path: Path to the file
+        file_path: Path to the PDF file
         
     Returns:
-        True if the file is a PDF, False otherwise
+        List of dictionaries containing text blocks with coordinates
     """
-    # Check file extension
-    if file_path.suffix.lower() != ".pdf":
-        return False
-    
-    # Check file content (PDF signature)
-    try:
-        with open(file_path, "rb") as f:
-            header = f.read(4)
-            return header == b"%PDF"
-    except Exception:
-        return False
+    return extract_text_blocks(file_path).to_dicts()
@@ -0,0 +1,28 @@
+"""
+Optional build script compiling the validator with Cython.
+
+Usage (from the backend directory):
+    pip install cython
+    python setup.py build_ext --inplace
+
+The compiled extension module is imported instead of validator.py; delete the
+generated .so/.pyd file to go back to the pure Python module.
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+
+setup(
+    name="healthcare-form-extraction-extensions",
+    ext_modules=cythonize(
+        ["validator.py"],
+        # Static types come from validator.pxd only; the annotations (e.g. List[...])
+        # would otherwise make the compiled functions reject tuples and other sequences
+        compiler_directives={
+            "language_level": 3,
+            "boundscheck": False,
+            "wraparound": False,
+            "annotation_typing": False
+        }
+    )
+)
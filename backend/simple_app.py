@@ -1,11 +1,23 @@
 """
 Simplified FastAPI application for testing the API structure.
 """
+import os
+
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import uuid
 from pathlib import Path
+from secrets import token_urlsafe
+
+from app_factory import save_upload_file
+
+# Directory where uploaded files are saved; read from the environment directly so
+# this mock app runs without the API key the full settings require
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", "./uploads"))
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+# Largest accepted upload (20 MiB)
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024
 
 # Create FastAPI app
 app = FastAPI(
@@ -39,12 +51,19 @@ async def extract_form_data(file: UploadFile = File(...)):
     Returns:
         JSON response with extracted data and screenshot URL
     """
+    # Reject uploads of a known oversized length before writing anything to disk
+    # (uploads of unknown length are checked while they are saved)
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    
     try:
         # Generate a unique ID for this extraction
-        extraction_id = str(uuid.uuid4())
+        extraction_id = token_urlsafe(16)
+        
+        # Save the uploaded file, streaming it to disk in chunks up to the size limit
+        await save_upload_file(file, UPLOAD_DIR, extraction_id, max_size=MAX_UPLOAD_SIZE)
         
-        # In a real implementation, we would:
-        # 1. Save the uploaded file
+        # In a real implementation, we would also:
         # 2. Extract text from the file
         # 3. Extract structured data using LLM
         # 4. Validate the extracted data
@@ -75,6 +94,8 @@ async def extract_form_data(file: UploadFile = File(...)):
             "screenshot_url": f"/screenshots/{extraction_id}_screenshot.png"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
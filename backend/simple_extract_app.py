@@ -2,18 +2,35 @@
 Simplified FastAPI application for healthcare form data extraction.
 This version bypasses complex validation to ensure reliable operation.
 """
+import atexit
+import importlib.util
+import io
 import logging
-import uuid
+import logging.handlers
+import os
+import queue
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from secrets import token_urlsafe
+from typing import BinaryIO, Dict, Any, List, Optional
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import BackgroundTasks, FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from app_factory import ImmutableStaticFiles, save_mock_screenshot, write_screenshot
 
 
 # Settings
@@ -31,6 +48,7 @@ class Settings(BaseSettings):
     host: str = Field("0.0.0.0", env="HOST")
     port: int = Field(8001, env="PORT")
     debug: bool = Field(True, env="DEBUG")
+    workers: int = Field(os.cpu_count() or 1, env="WORKERS")
     
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
@@ -40,17 +58,71 @@ class Settings(BaseSettings):
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, creating the working directories on first use.
+    
+    Returns:
+        Cached Settings instance
+    """
+    settings = Settings()
+    settings.initialize_directories()
+    return settings
+
+
 # Create a global settings instance
-settings = Settings()
-# Initialize directories
-settings.initialize_directories()
+settings = get_settings()
 
+# Working directories, resolved once instead of per request
+UPLOAD_DIR = settings.upload_dir.resolve()
+SCREENSHOT_DIR = settings.screenshot_dir.resolve()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if settings.debug else logging.WARNING,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Size of the chunks used to copy uploads to disk (1 MiB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Sections of the screenshot as (top of the box, text)
+SCREENSHOT_SECTIONS = (
+    (150, "Patient: John Doe"),
+    (220, "DOB: 1980-01-01 | Gender: Male"),
+    (290, "Insurance: Health Insurance Co (HI12345678)")
 )
+
+# Fixed sample data returned for every successful extraction
+SAMPLE_DATA = {
+    "patient_name": "John Doe",
+    "date_of_birth": "1980-01-01",
+    "gender": "Male",
+    "address": "123 Main St, City, State 12345",
+    "phone_number": "555-123-4567",
+    "email": "john.doe@example.com",
+    "insurance_provider": "Health Insurance Co",
+    "insurance_id": "HI12345678",
+    "medical_history": ["Asthma", "Hypertension"],
+    "current_medications": ["Albuterol", "Lisinopril"],
+    "allergies": ["Penicillin"],
+    "primary_complaint": "Chest pain",
+    "appointment_date": "2025-04-22",
+    "doctor_name": "Dr. Smith"
+}
+SAMPLE_DATA_JSON = orjson.dumps(SAMPLE_DATA)
+
+
+# Configure logging: records are queued by the calling thread and formatted and
+# written by a background listener, keeping stream I/O off the event loop. Like
+# basicConfig, this does nothing if the root logger already has handlers (e.g. when
+# uvicorn imports this module a second time in the same process).
+root_logger = logging.getLogger()
+if not root_logger.handlers:
+    log_queue = queue.SimpleQueue()
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    root_logger.setLevel(logging.INFO if settings.debug else logging.WARNING)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 logger = logging.getLogger(__name__)
 
 
@@ -58,7 +130,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Healthcare Form Data Extraction API",
     description="API for extracting data from healthcare forms using OCR and LLM",
-    version="0.1.0"
+    version="0.1.0",
+    # Serialize responses with orjson instead of the standard library json module
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -70,8 +144,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for screenshots
-app.mount("/screenshots", StaticFiles(directory=str(settings.screenshot_dir)), name="screenshots")
+# Mount static files for screenshots; each screenshot is named after its unique
+# extraction ID and never rewritten, so clients may cache it indefinitely
+app.mount(
+    "/screenshots",
+    ImmutableStaticFiles(directory=str(SCREENSHOT_DIR), html=False, check_dir=True),
+    name="screenshots"
+)
 
 
 @app.get("/")
@@ -81,50 +160,37 @@ async def root():
 
 
 @app.post("/api/extract")
-async def extract_form_data(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def extract_form_data(background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> Dict[str, Any]:
     """
     Extract data from a healthcare form (PDF or image).
     
+    The screenshot is rendered in a background task after the response is sent,
+    so clients should retry the screenshot URL if it is not available yet; a
+    placeholder image is saved under the same URL if rendering fails.
+    
     Args:
+        background_tasks: Tasks run after the response is sent
         file: Uploaded file (PDF or image)
         
     Returns:
         JSON response with extracted data and screenshot URL
     """
     try:
-        # Generate a unique ID for this extraction
-        extraction_id = str(uuid.uuid4())
+        # Generate a unique, unguessable ID for this extraction (it names the publicly served screenshot)
+        extraction_id = token_urlsafe(16)
         
         # Save the uploaded file
         file_path = await save_upload_file(file, extraction_id)
         
-        # Create a screenshot
-        screenshot_path = create_screenshot(extraction_id)
+        # Create the screenshot after responding (background tasks run in the threadpool)
+        background_tasks.add_task(create_screenshot, extraction_id)
         
-        # Generate screenshot URL
-        screenshot_url = f"/screenshots/{screenshot_path.name}" if screenshot_path else None
+        # Generate screenshot URL from the name the screenshot will be saved under
+        screenshot_url = f"/screenshots/{extraction_id}_screenshot.png"
         
-        # Return fixed sample data (no validation issues)
-        return {
-            "status": "ok",
-            "data": {
-                "patient_name": "John Doe",
-                "date_of_birth": "1980-01-01",
-                "gender": "Male",
-                "address": "123 Main St, City, State 12345",
-                "phone_number": "555-123-4567",
-                "email": "john.doe@example.com",
-                "insurance_provider": "Health Insurance Co",
-                "insurance_id": "HI12345678",
-                "medical_history": ["Asthma", "Hypertension"],
-                "current_medications": ["Albuterol", "Lisinopril"],
-                "allergies": ["Penicillin"],
-                "primary_complaint": "Chest pain",
-                "appointment_date": "2025-04-22",
-                "doctor_name": "Dr. Smith"
-            },
-            "screenshot_url": screenshot_url
-        }
+        # Return fixed sample data (no validation issues), serialized once at import
+        content = b'{"status":"ok","data":' + SAMPLE_DATA_JSON + b',"screenshot_url":' + orjson.dumps(screenshot_url) + b"}"
+        return Response(content=content, media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error processing form: {str(e)}")
@@ -166,79 +232,140 @@ async def save_upload_file(file: UploadFile, file_id: str) -> Path:
     file_extension = Path(file.filename).suffix if file.filename else ""
     
     # Create file path
-    file_path = settings.upload_dir / f"{file_id}{file_extension}"
+    file_path = UPLOAD_DIR / f"{file_id}{file_extension}"
     
-    # Save the file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Copy the spooled upload straight to disk in fixed-size chunks, in the threadpool
+    # so that neither the copy nor the disk writes block the event loop
+    await run_in_threadpool(copy_file_to_path, file.file, file_path)
     
     return file_path
 
 
-def create_screenshot(extraction_id: str) -> Path:
+def copy_file_to_path(source: BinaryIO, file_path: Path) -> None:
     """
-    Create a simple screenshot file.
+    Copy a file object to disk in fixed-size chunks.
+    
+    Args:
+        source: File object to read from its current position
+        file_path: Path to write the file to
+    """
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _load_font() -> "ImageFont.ImageFont":
+    """
+    Load the screenshot font once and reuse it across requests.
+    
+    Returns:
+        Arial at 20 points, or Pillow's default font if it cannot be found
+    """
+    try:
+        return ImageFont.truetype("arial.ttf", 20)
+    except IOError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _get_template() -> "Image.Image":
+    """
+    Render the static parts of the screenshot once and reuse them across requests.
+    
+    Returns:
+        Template image (must be copied before drawing on it)
+    """
+    # Create a blank image
+    width, height = 1000, 800
+    image = Image.new('RGB', (width, height), color=(255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    font = _load_font()
+    
+    # Draw the title (the extraction ID is drawn per request)
+    draw.text((50, 50), "Healthcare Form Data", fill=(0, 0, 0), font=font)
+    
+    # Draw form sections, each a boxed line of text
+    for top, text in SCREENSHOT_SECTIONS:
+        draw.rectangle([(50, top), (950, top + 50)], outline=(0, 0, 0))
+        draw.text((60, top + 10), text, fill=(0, 0, 0), font=font)
+    
+    return image
+
+
+def _render_png(extraction_id: str) -> bytes:
+    """
+    Render the screenshot for an extraction as PNG bytes.
     
     Args:
         extraction_id: Unique identifier for the extraction
         
     Returns:
-        Path to the screenshot
+        Encoded PNG image
     """
-    screenshot_path = settings.screenshot_dir / f"{extraction_id}_screenshot.png"
+    # Start from a copy of the pre-rendered static screenshot
+    image = _get_template().copy()
+    draw = ImageDraw.Draw(image)
     
-    try:
-        # Try to use PIL to create a simple image
-        try:
-            from PIL import Image, ImageDraw, ImageFont
-            
-            # Create a blank image
-            width, height = 1000, 800
-            image = Image.new('RGB', (width, height), color=(255, 255, 255))
-            draw = ImageDraw.Draw(image)
-            
-            # Try to load a font
-            try:
-                font = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
-            
-            # Draw some text
-            draw.text((50, 50), "Healthcare Form Data", fill=(0, 0, 0), font=font)
-            draw.text((50, 100), f"Extraction ID: {extraction_id}", fill=(0, 0, 0), font=font)
-            
-            # Draw form sections
-            draw.rectangle([(50, 150), (950, 200)], outline=(0, 0, 0))
-            draw.text((60, 160), "Patient: John Doe", fill=(0, 0, 0), font=font)
-            
-            draw.rectangle([(50, 220), (950, 270)], outline=(0, 0, 0))
-            draw.text((60, 230), "DOB: 1980-01-01 | Gender: Male", fill=(0, 0, 0), font=font)
-            
-            draw.rectangle([(50, 290), (950, 340)], outline=(0, 0, 0))
-            draw.text((60, 300), "Insurance: Health Insurance Co (HI12345678)", fill=(0, 0, 0), font=font)
-            
-            # Save the image
-            image.save(screenshot_path)
-            
-        except ImportError:
-            # If PIL is not available, create a text file instead
-            with open(screenshot_path.with_suffix('.txt'), "w") as f:
-                f.write(f"Mock screenshot for extraction ID: {extraction_id}")
-            screenshot_path = screenshot_path.with_suffix('.txt')
+    # Draw the extraction ID, the only per-request content
+    draw.text((50, 100), f"Extraction ID: {extraction_id}", fill=(0, 0, 0), font=_load_font())
+    
+    # Encode with fast compression; the screenshot is a transient preview
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def create_screenshot(extraction_id: str) -> Optional[Path]:
+    """
+    Create a simple screenshot file.
+    
+    The screenshot is always saved as {extraction_id}_screenshot.png, the URL
+    already returned to the client, and written atomically (see write_screenshot);
+    a placeholder PNG is written if PIL is not available or rendering fails.
+    
+    Args:
+        extraction_id: Unique identifier for the extraction
         
-        return screenshot_path
+    Returns:
+        Path to the screenshot, or None if no file could be written
+    """
+    # Use PIL to create a simple image
+    if PIL_AVAILABLE:
+        try:
+            return write_screenshot(SCREENSHOT_DIR, extraction_id, _render_png(extraction_id))
+        except Exception as e:
+            logger.error(f"Error creating screenshot: {str(e)}")
     
-    except Exception as e:
-        logger.error(f"Error creating screenshot: {str(e)}")
+    # If PIL is not available or rendering failed, write the placeholder image instead
+    try:
+        return save_mock_screenshot(SCREENSHOT_DIR, extraction_id)
+    except OSError as e:
+        logger.error(f"Error creating placeholder screenshot: {str(e)}")
         return None
 
-
 if __name__ == "__main__":
-    # Run the FastAPI app with uvicorn
+    # In production, hand the process over to gunicorn managing uvicorn workers
+    if settings.workers > 1 and not settings.debug and shutil.which("gunicorn"):
+        os.execvp("gunicorn", [
+            "gunicorn", "simple_extract_app:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(settings.workers),
+            "--bind", f"{settings.host}:{settings.port}",
+            "--log-level", "warning"
+        ])
+    
+    # Run the FastAPI app with uvicorn (a single reloading worker in debug mode), on
+    # uvloop and httptools where available (installed by uvicorn[standard]; uvloop is
+    # not available on Windows)
     uvicorn.run(
         "simple_extract_app:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
+        # Per-request access logs are only written in debug mode
+        access_log=settings.debug,
+        log_level="info" if settings.debug else "warning",
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11"
     )
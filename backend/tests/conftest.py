@@ -0,0 +1,8 @@
+"""
+Shared pytest configuration for the backend tests.
+"""
+import sys
+from pathlib import Path
+
+# Make the backend modules importable from the tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -1,41 +1,69 @@
 """
 Tests for the FastAPI application.
 """
+import asyncio
+import io
 import os
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
+from fastapi import HTTPException, UploadFile
 from fastapi.testclient import TestClient
 
-# Add parent directory to path to import modules
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from app import app
+from app import app, is_cacheable
+from app_factory import MOCK_SCREENSHOT_PNG, create_app, save_mock_screenshot, save_upload_file, write_screenshot
+from cache import DiskCache, LRUCache
 
 
 class TestApp(unittest.TestCase):
     """Test cases for the FastAPI application."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Set up a test client, shared by all tests, for an app built with mock pipeline components."""
+        cls.mock_extract_text = MagicMock()
+        cls.mock_extract_fields = MagicMock()
+        cls.mock_validate = MagicMock()
+        cls.mock_fill_form = MagicMock()
+        cls.mock_is_cacheable = MagicMock()
+        
+        # Keep the upload, screenshot and cache directories out of the working directory
+        work_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(work_dir.cleanup)
+        cls.work_dir = Path(work_dir.name)
+        cls.response_cache = LRUCache()
+        cls.disk_cache = DiskCache(cls.work_dir / "responses.sqlite3")
+        cls.client = TestClient(create_app(
+            upload_dir=cls.work_dir,
+            screenshot_dir=cls.work_dir,
+            extract_text=cls.mock_extract_text,
+            extract_fields=cls.mock_extract_fields,
+            validate=cls.mock_validate,
+            fill_form=cls.mock_fill_form,
+            response_cache=cls.response_cache,
+            disk_cache=cls.disk_cache,
+            is_cacheable=cls.mock_is_cacheable
+        ))
+        cls.app_client = TestClient(app)
+    
     def setUp(self):
-        """Set up the test client."""
-        self.client = TestClient(app)
+        """Reset the mock pipeline components and caches between tests."""
+        for mock in (self.mock_extract_text, self.mock_extract_fields, self.mock_validate, self.mock_fill_form, self.mock_is_cacheable):
+            mock.reset_mock(return_value=True, side_effect=True)
+        self.response_cache.clear()
+        self.disk_cache.clear()
     
     def test_root_endpoint(self):
         """Test that the root endpoint returns the expected response."""
-        response = self.client.get("/")
+        response = self.app_client.get("/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"message": "Healthcare Form Data Extraction API"})
     
-    @patch('app.save_upload_file')
-    @patch('app.extract_text_from_file')
-    @patch('app.llm_extractor.extract_fields')
-    @patch('app.validate')
-    @patch('app.fill_form')
-    def test_extract_form_data_endpoint(self, mock_fill_form, mock_validate, mock_extract_fields, 
-                                       mock_extract_text, mock_save_file):
+    @patch('app_factory.save_upload_file')
+    def test_extract_form_data_endpoint(self, mock_save_file):
         """Test that the extract_form_data endpoint returns the expected response."""
         # Mock the file upload
         test_file = MagicMock()
@@ -43,8 +71,8 @@ class TestApp(unittest.TestCase):
         
         # Set up the mock return values
         mock_save_file.return_value = Path("uploads/test.pdf")
-        mock_extract_text.return_value = [{"text": "Test Text", "page": 1}]
-        mock_extract_fields.return_value = {
+        self.mock_extract_text.return_value = [{"text": "Test Text", "page": 1}]
+        self.mock_extract_fields.return_value = {
             "patient_name": "John Doe",
             "date_of_birth": "1980-01-01",
             "gender": "Male",
@@ -56,8 +84,7 @@ class TestApp(unittest.TestCase):
         }
         
         # Mock the validated data
-        mock_validated_data = MagicMock()
-        mock_validated_data.dict.return_value = {
+        self.mock_validate.return_value = {
             "patient_name": "John Doe",
             "date_of_birth": "1980-01-01",
             "gender": "Male",
@@ -67,10 +94,9 @@ class TestApp(unittest.TestCase):
             "insurance_id": "HI12345678",
             "primary_complaint": "Chest pain"
         }
-        mock_validate.return_value = mock_validated_data
         
         # Mock the screenshot path
-        mock_fill_form.return_value = Path("screenshots/test_screenshot.png")
+        self.mock_fill_form.return_value = Path("screenshots/test_screenshot.png")
         
         # Make the request
         with patch('builtins.open', unittest.mock.mock_open(read_data=b"test")):
@@ -86,12 +112,71 @@ class TestApp(unittest.TestCase):
         
         # Check that all the mock functions were called
         mock_save_file.assert_called_once()
-        mock_extract_text.assert_called_once()
-        mock_extract_fields.assert_called_once()
-        mock_validate.assert_called_once()
-        mock_fill_form.assert_called_once()
+        self.mock_extract_text.assert_called_once()
+        self.mock_extract_fields.assert_called_once()
+        self.mock_validate.assert_called_once()
+        self.mock_fill_form.assert_called_once()
     
-    @patch('app.save_upload_file')
+    @patch('app_factory.save_upload_file')
+    def test_extract_form_data_endpoint_cached(self, mock_save_file):
+        """Test that repeated uploads of the same document are served from the cache."""
+        async def fake_save(file, upload_dir, file_id, digest=None):
+            digest.update(b"same document")
+            return Path("uploads/test.pdf")
+        
+        # Set up the mock return values
+        mock_save_file.side_effect = fake_save
+        self.mock_extract_text.return_value = [{"text": "Test Text", "page": 1}]
+        self.mock_extract_fields.return_value = {"patient_name": "John Doe"}
+        self.mock_validate.return_value = {"patient_name": "John Doe"}
+        self.mock_fill_form.return_value = Path("screenshots/test_screenshot.png")
+        
+        # Upload the same document twice
+        responses = [
+            self.client.post("/api/extract", files={"file": ("test.pdf", b"test", "application/pdf")})
+            for _ in range(2)
+        ]
+        
+        # Check that both responses match and the pipeline only ran once
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].json(), responses[1].json())
+        self.assertEqual(mock_save_file.call_count, 2)
+        self.mock_extract_text.assert_called_once()
+        self.mock_extract_fields.assert_called_once()
+        self.mock_validate.assert_called_once()
+        self.mock_fill_form.assert_called_once()
+    
+    @patch('app_factory.save_upload_file')
+    def test_extract_form_data_endpoint_fallback_not_cached(self, mock_save_file):
+        """Test that responses built from placeholder data are not cached."""
+        async def fake_save(file, upload_dir, file_id, digest=None):
+            digest.update(b"same document")
+            return Path("uploads/test.pdf")
+        
+        # Set up the mock return values, with the pipeline falling back on an error
+        mock_save_file.side_effect = fake_save
+        self.mock_extract_text.return_value = [{"text": "Test Text", "page": 1}]
+        self.mock_extract_fields.return_value = {"patient_name": "Unable to extract - API error"}
+        self.mock_validate.return_value = {"patient_name": "Unable to extract - API error"}
+        self.mock_fill_form.return_value = Path("screenshots/test_screenshot.png")
+        self.mock_is_cacheable.return_value = False
+        
+        # Upload the same document twice
+        for _ in range(2):
+            response = self.client.post("/api/extract", files={"file": ("test.pdf", b"test", "application/pdf")})
+            self.assertEqual(response.status_code, 200)
+        
+        # Check that the pipeline ran for both uploads
+        self.assertEqual(self.mock_extract_fields.call_count, 2)
+        self.assertEqual(len(self.response_cache), 0)
+    
+    def test_is_cacheable(self):
+        """Test that the LLM and validation placeholders are recognized as not cacheable."""
+        self.assertTrue(is_cacheable({"patient_name": "John Doe"}))
+        self.assertFalse(is_cacheable({"patient_name": "Unable to extract - API error"}))
+        self.assertFalse(is_cacheable({"patient_name": "Error in validation"}))
+    
+    @patch('app_factory.save_upload_file')
     def test_extract_form_data_endpoint_error(self, mock_save_file):
         """Test that the extract_form_data endpoint handles errors correctly."""
         # Mock the file upload
@@ -112,6 +197,51 @@ class TestApp(unittest.TestCase):
         self.assertEqual(response.status_code, 500)
         self.assertEqual(response.json()["detail"], "Test error")
 
+    
+    def test_screenshots_are_served_with_cache_headers(self):
+        """Test that screenshots are served with long-lived cache headers."""
+        save_mock_screenshot(self.work_dir, "abc123")
+        
+        response = self.client.get("/screenshots/abc123_screenshot.png")
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, MOCK_SCREENSHOT_PNG)
+        self.assertEqual(response.headers["cache-control"], "public, max-age=31536000, immutable")
+        self.assertIn("etag", response.headers)
+    
+    def test_save_mock_screenshot(self):
+        """Test that save_mock_screenshot writes a PNG named after the extraction ID."""
+        with tempfile.TemporaryDirectory() as screenshot_dir:
+            screenshot_path = save_mock_screenshot(Path(screenshot_dir), "abc123")
+            
+            self.assertEqual(screenshot_path.name, "abc123_screenshot.png")
+            self.assertEqual(screenshot_path.read_bytes(), MOCK_SCREENSHOT_PNG)
+            self.assertTrue(MOCK_SCREENSHOT_PNG.startswith(b"\x89PNG\r\n\x1a\n"))
+    
+    def test_write_screenshot_replaces_atomically(self):
+        """Test that write_screenshot renames a complete file into place and leaves no temporary file."""
+        with tempfile.TemporaryDirectory() as screenshot_dir:
+            screenshot_dir = Path(screenshot_dir)
+            
+            with patch("app_factory.os.replace", wraps=os.replace) as mock_replace:
+                screenshot_path = write_screenshot(screenshot_dir, "abc123", b"png")
+            
+            mock_replace.assert_called_once()
+            self.assertEqual(screenshot_path.read_bytes(), b"png")
+            self.assertEqual([path.name for path in screenshot_dir.iterdir()], ["abc123_screenshot.png"])
+    
+    def test_save_upload_file_enforces_max_size(self):
+        """Test that uploads of unknown length are rejected once they exceed max_size."""
+        with tempfile.TemporaryDirectory() as upload_dir:
+            upload = UploadFile(io.BytesIO(b"x" * 100), filename="test.pdf")
+            self.assertIsNone(upload.size)
+            
+            with self.assertRaises(HTTPException) as context:
+                asyncio.run(save_upload_file(upload, Path(upload_dir), "abc123", max_size=50))
+            
+            self.assertEqual(context.exception.status_code, 413)
+            self.assertEqual(list(Path(upload_dir).iterdir()), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for the cache module.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from cache import DiskCache, LRUCache, SemanticCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the LRUCache class."""
+
+    def test_get_returns_stored_value(self):
+        """Test that get returns a previously stored value."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", {"status": "ok"})
+
+        self.assertEqual(cache.get("a"), {"status": "ok"})
+        self.assertIsNone(cache.get("missing"))
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Touch "a" so that "b" becomes the least recently used entry
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_zero_maxsize_disables_cache(self):
+        """Test that a cache with maxsize 0 never stores anything."""
+        cache = LRUCache(maxsize=0)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test cases for the DiskCache class."""
+
+    def setUp(self):
+        """Create a temporary directory for the cache database."""
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.path = Path(cache_dir.name) / "cache" / "responses.sqlite3"
+
+    def test_values_persist_across_instances(self):
+        """Test that values written by one instance are read by another."""
+        DiskCache(self.path).set("digest", {"status": "ok", "data": {"allergies": ["Penicillin"]}})
+
+        self.assertEqual(
+            DiskCache(self.path).get("digest"),
+            {"status": "ok", "data": {"allergies": ["Penicillin"]}}
+        )
+        self.assertIsNone(DiskCache(self.path).get("missing"))
+
+    def test_expired_entries_are_ignored(self):
+        """Test that entries older than the TTL are not returned."""
+        cache = DiskCache(self.path, ttl=-1)
+        cache.set("digest", {"status": "ok"})
+
+        self.assertIsNone(cache.get("digest"))
+
+    def test_other_versions_are_ignored(self):
+        """Test that entries written under another version are not returned."""
+        DiskCache(self.path, version="0.1.0").set("digest", {"status": "ok"})
+
+        self.assertIsNone(DiskCache(self.path, version="0.2.0").get("digest"))
+
+    def test_evicts_oldest_entries_over_max_entries(self):
+        """Test that only the newest max_entries entries are kept."""
+        cache = DiskCache(self.path, max_entries=2, prune_interval=1)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "b")
+        self.assertEqual(cache.get("c"), "c")
+
+    def test_prunes_every_prune_interval_writes(self):
+        """Test that excess entries are only evicted once prune_interval writes have been made."""
+        cache = DiskCache(self.path, max_entries=1, prune_interval=3)
+        for key in ("a", "b"):
+            cache.set(key, key)
+
+        self.assertEqual(cache.get("a"), "a")
+
+        cache.set("c", "c")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "c")
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test cases for the SemanticCache class."""
+
+    TEXT = "Patient Name: John Doe Date of Birth: 1980-01-01 Insurance: Health Insurance Co"
+
+    def test_get_returns_value_for_identical_text(self):
+        """Test that an identical document is a cache hit."""
+        cache = SemanticCache(maxsize=4, threshold=0.98)
+        cache.set(self.TEXT, {"patient_name": "John Doe"})
+
+        self.assertEqual(cache.get(self.TEXT), {"patient_name": "John Doe"})
+
+    def test_get_misses_dissimilar_text(self):
+        """Test that an unrelated document is a cache miss."""
+        cache = SemanticCache(maxsize=4, threshold=0.98)
+        cache.set(self.TEXT, {"patient_name": "John Doe"})
+
+        self.assertIsNone(cache.get("Discharge summary for Jane Roe, cardiology ward"))
+        self.assertIsNone(cache.get(""))
+
+    def test_replaces_oldest_entry_when_full(self):
+        """Test that the oldest document is replaced once the cache is full."""
+        cache = SemanticCache(maxsize=1, threshold=0.98)
+        cache.set(self.TEXT, 1)
+        cache.set("Completely different document text", 2)
+
+        self.assertIsNone(cache.get(self.TEXT))
+        self.assertEqual(cache.get("Completely different document text"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
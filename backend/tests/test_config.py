@@ -8,10 +8,6 @@ from unittest.mock import patch
 
 import pytest
 
-# Add parent directory to path to import modules
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from config import Settings
 
 
@@ -32,6 +28,27 @@ class TestConfig(unittest.TestCase):
             self.assertEqual(settings.port, 8001)
             self.assertEqual(settings.debug, True)
     
+    def test_render_workers_split_between_server_workers(self):
+        """Test that the render pool size defaults to the CPUs available per server worker."""
+        env = {"GROQ_API_KEY": "test_key", "DEBUG": "False", "WORKERS": "4"}
+        with patch.dict(os.environ, env), patch("config.os.cpu_count", return_value=8):
+            self.assertEqual(Settings().render_workers, 2)
+            
+            with patch.dict(os.environ, {"WORKERS": "16"}):
+                self.assertEqual(Settings().render_workers, 1)
+            
+            with patch.dict(os.environ, {"RENDER_WORKERS": "0"}):
+                self.assertEqual(Settings().render_workers, 0)
+    
+    def test_pdf_workers_split_between_server_workers(self):
+        """Test that the PDF parsing pool size defaults to the CPUs available per server worker."""
+        env = {"GROQ_API_KEY": "test_key", "DEBUG": "False", "WORKERS": "4"}
+        with patch.dict(os.environ, env), patch("config.os.cpu_count", return_value=8):
+            self.assertEqual(Settings().pdf_workers, 2)
+            
+            with patch.dict(os.environ, {"PDF_WORKERS": "3"}):
+                self.assertEqual(Settings().pdf_workers, 3)
+    
     def test_initialize_directories(self):
         """Test that initialize_directories creates the necessary directories."""
         with patch.dict(os.environ, {"GROQ_API_KEY": "test_key"}):
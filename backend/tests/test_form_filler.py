@@ -0,0 +1,94 @@
+"""
+Tests for the form_filler module.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+from PIL import Image
+
+from form_filler import FormVisualizer
+
+
+class TestFormVisualizer(unittest.TestCase):
+    """Test cases for the FormVisualizer class."""
+
+    def setUp(self):
+        """Set up a visualizer writing to a temporary directory."""
+        screenshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(screenshot_dir.cleanup)
+        self.visualizer = FormVisualizer(screenshot_dir=Path(screenshot_dir.name))
+
+        # Test data with multiline and list values
+        self.test_data = {
+            "patient_name": "John Doe",
+            "date_of_birth": "1980-01-01",
+            "gender": "Male",
+            "address": "123 Main St\nCity, State 12345",
+            "phone_number": "555-123-4567",
+            "insurance_provider": "Health Insurance Co",
+            "insurance_id": "HI12345678",
+            "medical_history": ["Asthma", "Hypertension"],
+            "current_medications": ["Albuterol"],
+            "allergies": [],
+            "primary_complaint": "Chest pain"
+        }
+
+    def test_create_form_visualization(self):
+        """Test that create_form_visualization renders a PNG image."""
+        result = self.visualizer.create_form_visualization(self.test_data, "form123")
+
+        self.assertEqual(result.name, "form123_screenshot.png")
+        with Image.open(result) as image:
+            self.assertEqual(image.format, "PNG")
+            self.assertEqual(image.size, (1000, 1400))
+
+    def test_template_is_not_modified(self):
+        """Test that rendering a form does not draw on the shared template."""
+        self.visualizer.create_form_visualization(self.test_data, "form123")
+        template = self.visualizer._get_template().copy()
+
+        self.visualizer.create_form_visualization(self.test_data, "form456")
+
+        self.assertEqual(self.visualizer._get_template().tobytes(), template.tobytes())
+
+    def test_canvas_is_reused(self):
+        """Test that a pooled canvas is reset to the template before drawing the next form."""
+        first = self.visualizer.create_form_visualization(self.test_data, "form123")
+        with Image.open(first) as image:
+            expected = image.tobytes()
+        canvas = self.visualizer._canvases.queue[0]
+
+        other_data = dict(self.test_data, patient_name="Jane Roe", medical_history=["Diabetes"] * 5)
+        self.visualizer.create_form_visualization(other_data, "form123")
+        second = self.visualizer.create_form_visualization(self.test_data, "form123")
+
+        self.assertIs(self.visualizer._canvases.queue[0], canvas)
+        with Image.open(second) as image:
+            self.assertEqual(image.tobytes(), expected)
+
+    @patch('form_filler.PYVIPS_AVAILABLE', True)
+    def test_pyvips_backend(self):
+        """Test that the pyvips backend encodes the rendered RGB pixels."""
+        mock_pyvips = MagicMock()
+        with patch('form_filler.pyvips', mock_pyvips, create=True):
+            visualizer = FormVisualizer(screenshot_dir=self.visualizer.screenshot_dir, compress_level=6, png_backend="pyvips")
+            result = visualizer.create_form_visualization(self.test_data, "form123")
+
+        self.assertEqual(result.name, "form123_screenshot.png")
+        args = mock_pyvips.Image.new_from_memory.call_args[0]
+        self.assertEqual(args[1:], (1000, 1400, 3, "uchar"))
+        mock_pyvips.Image.new_from_memory.return_value.pngsave.assert_called_once_with(str(result), compression=6)
+
+    @patch('form_filler.PYVIPS_AVAILABLE', False)
+    def test_pyvips_backend_falls_back_to_pillow(self):
+        """Test that the Pillow encoder is used when pyvips is not installed."""
+        visualizer = FormVisualizer(screenshot_dir=self.visualizer.screenshot_dir, png_backend="pyvips")
+
+        self.assertEqual(visualizer.png_backend, "pillow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for the llm_extractor module.
+"""
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from llm_extractor import USER_PROMPT_PREFIX, llm_extractor
+from text_blocks import TextBlocks
+
+
+class TestLLMExtractor(unittest.TestCase):
+    """Test cases for the LLMExtractor class."""
+
+    def setUp(self):
+        """Set up text blocks of a form with labelled fields."""
+        llm_extractor.completion_cache.clear()
+        self.addCleanup(llm_extractor.completion_cache.clear)
+        self.text_blocks = [
+            {"text": "Patient Name: John Doe", "page": 1, "x0": 10, "y0": 10},
+            {"text": "DOB: 1980-01-01", "page": 1, "x0": 10, "y0": 30},
+            {"text": "Phone: 555-123-4567", "page": 1, "x0": 10, "y0": 50},
+            {"text": "Email: john.doe@example.com", "page": 1, "x0": 10, "y0": 70},
+            {"text": "Insurance ID: HI12345678", "page": 1, "x0": 10, "y0": 90},
+            {"text": "Appointment: 2025-04-22", "page": 1, "x0": 10, "y0": 110}
+        ]
+
+    def test_regex_prepass(self):
+        """Test that labelled fields are read from the text."""
+        combined_text = llm_extractor._combine_text_blocks(self.text_blocks)
+
+        self.assertEqual(llm_extractor._regex_prepass(combined_text), {
+            "email": "john.doe@example.com",
+            "phone_number": "555-123-4567",
+            "date_of_birth": "1980-01-01",
+            "insurance_id": "HI12345678"
+        })
+
+    def test_regex_prepass_skips_clinic_email(self):
+        """Test that only a labelled email address is taken as the patient's."""
+        combined_text = "Contact frontdesk@sunrise.org with questions.\nEmail: jane@example.com"
+
+        self.assertEqual(llm_extractor._regex_prepass(combined_text), {"email": "jane@example.com"})
+        self.assertEqual(llm_extractor._regex_prepass("Contact frontdesk@sunrise.org"), {})
+
+    def test_regex_prepass_insurance_label_words(self):
+        """Test that longer label words and values without digits are not read as an insurance ID."""
+        self.assertEqual(llm_extractor._regex_prepass("Insurance Identification: ABC12345"), {})
+        self.assertEqual(llm_extractor._regex_prepass("Member Number: PENDING"), {})
+        self.assertEqual(
+            llm_extractor._regex_prepass("Policy No. AB-12345"),
+            {"insurance_id": "AB-12345"}
+        )
+
+    def test_combine_columnar_text_blocks(self):
+        """Test that TextBlocks are combined in reading order like the equivalent dictionaries."""
+        blocks = list(reversed(self.text_blocks))
+        text_blocks = TextBlocks.from_lists(
+            text=[block["text"] for block in blocks],
+            bbox=[(block["x0"], block["y0"], block["x0"] + 100, block["y0"] + 10) for block in blocks],
+            page=[block["page"] for block in blocks],
+            size=[10] * len(blocks),
+            font=["Arial"] * len(blocks),
+            color=[0] * len(blocks)
+        )
+
+        self.assertEqual(
+            llm_extractor._combine_text_blocks(text_blocks),
+            llm_extractor._combine_text_blocks(self.text_blocks)
+        )
+
+    def test_prepass_fills_missing_llm_fields(self):
+        """Test that the pre-pass only fills fields the LLM left empty."""
+        response = '{"patient_name": "John Doe", "phone_number": "Unknown", "email": "jd@example.org"}'
+        with patch.object(llm_extractor, "_complete", return_value=response):
+            result = llm_extractor.extract_fields(self.text_blocks)
+
+        self.assertEqual(result["phone_number"], "555-123-4567")
+        self.assertEqual(result["email"], "jd@example.org")
+        self.assertEqual(result["gender"], "Unknown")
+
+    def test_prepass_fields_are_left_to_the_regexes(self):
+        """Test that the LLM is asked to leave the pre-pass fields null, after the document text."""
+        combined_text = llm_extractor._combine_text_blocks(self.text_blocks)
+        with patch.object(llm_extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value.choices[0].message.content = '{"patient_name": "John Doe"}'
+            result = llm_extractor.extract_fields(self.text_blocks)
+
+        user_prompt = mock_create.call_args.kwargs["messages"][1]["content"]
+        self.assertTrue(user_prompt.startswith(USER_PROMPT_PREFIX + combined_text))
+        self.assertTrue(user_prompt.endswith("set them to null: email, phone_number, date_of_birth, insurance_id"))
+        self.assertEqual(result["insurance_id"], "HI12345678")
+
+    def test_identical_text_is_served_from_cache(self):
+        """Test that the LLM is called once for repeated document text, and not cached on errors."""
+        with patch.object(llm_extractor, "_complete", side_effect=RuntimeError("API down")) as mock_complete:
+            llm_extractor.extract_fields(self.text_blocks)
+            llm_extractor.extract_fields(self.text_blocks)
+        self.assertEqual(mock_complete.call_count, 2)
+
+        with patch.object(llm_extractor, "_complete", return_value='{"patient_name": "John Doe"}') as mock_complete:
+            first = llm_extractor.extract_fields(self.text_blocks)
+            second = llm_extractor.extract_fields(self.text_blocks)
+
+        mock_complete.assert_called_once()
+        self.assertEqual(first, second)
+
+    def test_fallback_keeps_prepass_fields(self):
+        """Test that the error fallback includes the fields found by the pre-pass."""
+        with patch.object(llm_extractor, "_complete", side_effect=RuntimeError("API down")):
+            result = llm_extractor.extract_fields(self.text_blocks)
+
+        self.assertEqual(result["patient_name"], "Unable to extract - API error")
+        self.assertEqual(result["date_of_birth"], "1980-01-01")
+        self.assertIn("API down", result["primary_complaint"])
+
+
+if __name__ == "__main__":
+    unittest.main()
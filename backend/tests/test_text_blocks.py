@@ -0,0 +1,59 @@
+"""
+Tests for the text_blocks module.
+"""
+import unittest
+
+import pytest
+
+from text_blocks import TextBlocks
+
+
+class TestTextBlocks(unittest.TestCase):
+    """Test cases for the TextBlocks class."""
+
+    def setUp(self):
+        """Set up spans in scrambled reading order."""
+        self.blocks = TextBlocks.from_lists(
+            text=["Second page", "Right", "Left", "Top"],
+            bbox=[(10, 10, 90, 20), (200, 50, 300, 60), (100, 50, 150, 60), (100, 10, 200, 20)],
+            page=[2, 1, 1, 1],
+            size=[12, 10, 10, 14],
+            font=["Arial", "Arial", "Arial", "Arial-Bold"],
+            color=[0, 0, 0, 255]
+        )
+
+    def test_to_dicts(self):
+        """Test that to_dicts produces the list-of-dicts layout."""
+        result = self.blocks.to_dicts()
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(result[3], {
+            "text": "Top",
+            "page": 1,
+            "x0": 100,
+            "y0": 10,
+            "x1": 200,
+            "y1": 20,
+            "font": "Arial-Bold",
+            "size": 14,
+            "color": 255
+        })
+
+    def test_reading_order(self):
+        """Test that reading_order sorts by page, then top to bottom, then left to right."""
+        order = self.blocks.reading_order()
+
+        self.assertEqual([self.blocks.text[i] for i in order], ["Top", "Left", "Right", "Second page"])
+
+    def test_empty(self):
+        """Test that empty input produces empty arrays."""
+        blocks = TextBlocks.from_lists([], [], [], [], [], [])
+
+        self.assertEqual(len(blocks), 0)
+        self.assertEqual(blocks.bbox.shape, (0, 4))
+        self.assertEqual(blocks.to_dicts(), [])
+        self.assertEqual(len(blocks.reading_order()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
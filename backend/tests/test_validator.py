@@ -1,7 +1,6 @@
 """
 Tests for the validator module.
 """
-import os
 import unittest
 from unittest.mock import patch
 
@@ -9,11 +8,7 @@ import pandas as pd
 import pytest
 import pandera as pa
 
-# Add parent directory to path to import modules
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from validator import validate, FormData
+from validator import validate, validate_many, FormData
 
 
 class TestValidator(unittest.TestCase):
@@ -119,6 +114,75 @@ class TestValidator(unittest.TestCase):
         
         # Check that the gender was normalized to title case
         self.assertEqual(result.gender, "Male")
+    
+    def test_validate_non_string_dates(self):
+        """Test that non-string dates become Unknown for the birth date and None for the appointment."""
+        result = validate({"patient_name": "John Doe", "date_of_birth": 19800101, "appointment_date": 20250422})
+        
+        self.assertEqual(result.date_of_birth, "Unknown")
+        self.assertIsNone(result.appointment_date)
+    
+    def test_validate_non_string_text_fields(self):
+        """Test that validate converts non-string text fields instead of falling back."""
+        result = validate({"patient_name": "John Doe", "insurance_id": 12345678, "phone_number": 5551234567})
+        
+        self.assertEqual(result.patient_name, "John Doe")
+        self.assertEqual(result.insurance_id, "12345678")
+        self.assertEqual(result.phone_number, "5551234567")
+        
+        # Containers are not turned into their repr
+        self.assertEqual(validate({"patient_name": ["John", "Doe"]}).patient_name, "Error in validation")
+        self.assertEqual(validate({"patient_name": "John Doe", "email": {"home": "jd@example.com"}}).patient_name, "Error in validation")
+    
+    def test_validate_memoizes_identical_payloads(self):
+        """Test that memoized results are returned as independent copies and keyed by value type."""
+        test_data = {"patient_name": "John Doe", "allergies": ["Penicillin"]}
+        
+        result = validate(dict(test_data))
+        result.allergies.append("Latex")
+        
+        self.assertEqual(validate(dict(test_data)).allergies, ["Penicillin"])
+        self.assertEqual(validate({"patient_name": "John Doe", "phone_number": 1}).phone_number, "1")
+        self.assertEqual(validate({"patient_name": "John Doe", "phone_number": True}).phone_number, "True")
+        self.assertEqual(validate({"patient_name": "John Doe", "allergies": {"Penicillin"}}).allergies, ["Penicillin"])
+    
+    def test_validate_leaves_input_unchanged(self):
+        """Test that memoized and unmemoized payloads are normalized on a copy and not rewritten as JSON."""
+        memoized = {"patient_name": "John Doe", "phone_number": None, "allergies": "Penicillin"}
+        unmemoized = {"patient_name": "John Doe", "phone_number": None, "allergies": {"Penicillin"}}
+
+        self.assertEqual(validate(memoized).phone_number, "Unknown")
+        self.assertEqual(validate(unmemoized).phone_number, "Unknown")
+        self.assertEqual(memoized, {"patient_name": "John Doe", "phone_number": None, "allergies": "Penicillin"})
+        self.assertEqual(unmemoized, {"patient_name": "John Doe", "phone_number": None, "allergies": {"Penicillin"}})
+
+        # NaN would become null in JSON
+        self.assertEqual(validate({"patient_name": "John Doe", "phone_number": float("nan")}).phone_number, "nan")
+
+    def test_validation_errors_do_not_share_lists(self):
+        """Test that placeholder results for failed validations have independent lists."""
+        first = validate({"patient_name": "John Doe", "allergies": [{"name": "Penicillin"}]})
+        first.allergies.append("Latex")
+        
+        second = validate({"patient_name": "Jane Roe", "allergies": [{"name": "Penicillin"}]})
+        
+        self.assertEqual(second.patient_name, "Error in validation")
+        self.assertEqual(second.allergies, [])
+    
+    def test_validate_many(self):
+        """Test that validate_many normalizes each record and falls back only for invalid ones."""
+        records = [
+            {"patient_name": "John Doe", "gender": "male", "allergies": "Penicillin, Latex"},
+            {"patient_name": "Jane Roe", "medical_history": [{"name": "Asthma"}]}
+        ]
+        
+        result = validate_many(records)
+        
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0].gender, "Male")
+        self.assertEqual(result[0].allergies, ["Penicillin", "Latex"])
+        self.assertEqual(result[1].patient_name, "Error in validation")
+        self.assertEqual([form.patient_name for form in validate_many(records[:1])], ["John Doe"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""
+Text blocks module providing a compact struct-of-arrays layout for text spans.
+Coordinates and numeric attributes are stored in parallel NumPy arrays so that
+reading-order sorts and other bounding-box operations can be vectorized.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+@dataclass
+class TextBlocks:
+    """Text spans extracted from a document, stored as parallel arrays."""
+
+    text: List[str]
+    bbox: np.ndarray  # (N, 4) float32: x0, y0, x1, y1
+    page: np.ndarray  # (N,) int32, 1-based
+    size: np.ndarray  # (N,) float32
+    font: List[str]
+    color: np.ndarray  # (N,) int32
+
+    @classmethod
+    def from_lists(
+        cls,
+        text: List[str],
+        bbox: List[Any],
+        page: List[int],
+        size: List[float],
+        font: List[str],
+        color: List[int]
+    ) -> "TextBlocks":
+        """
+        Build text blocks from plain Python lists, converting each column once.
+
+        Args:
+            text: Span texts
+            bbox: Span bounding boxes as (x0, y0, x1, y1) sequences
+            page: 1-based page numbers
+            size: Font sizes
+            font: Font names
+            color: sRGB colors as integers
+
+        Returns:
+            TextBlocks instance
+        """
+        return cls(
+            text=text,
+            bbox=np.asarray(bbox, dtype=np.float32).reshape(-1, 4),
+            page=np.asarray(page, dtype=np.int32),
+            size=np.asarray(size, dtype=np.float32),
+            font=font,
+            color=np.asarray(color, dtype=np.int32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def reading_order(self) -> np.ndarray:
+        """
+        Compute the indices that sort the spans by page, then top to bottom, then left to right.
+
+        Returns:
+            Array of span indices in reading order
+        """
+        return np.lexsort((self.bbox[:, 0], self.bbox[:, 1], self.page))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Convert to the list-of-dicts layout used by the rest of the pipeline.
+
+        Returns:
+            List of dictionaries containing text blocks with coordinates
+        """
+        return [
+            {
+                "text": text,
+                "page": page,
+                "x0": x0,
+                "y0": y0,
+                "x1": x1,
+                "y1": y1,
+                "font": font,
+                "size": size,
+                "color": color
+            }
+            for text, (x0, y0, x1, y1), page, font, size, color in zip(
+                self.text, self.bbox.tolist(), self.page.tolist(), self.font, self.size.tolist(), self.color.tolist()
+            )
+        ]
@@ -0,0 +1,11 @@
+# Static types used when validator.py is compiled with Cython (see setup.py).
+# validator.py itself stays plain Python and is imported as-is when not compiled.
+import cython
+
+
+@cython.locals(field=str, list_field=str)
+cpdef dict _normalize(dict data)
+
+cpdef object _validate(dict data)
+
+cpdef list validate_many(object records)
@@ -1,101 +1,110 @@
 """
 Validator module for validating extracted healthcare form data.
 Uses Pandera for DataFrame validation and Pydantic for type validation.
+Pandas and Pandera are only imported once a DataFrame is validated.
 """
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
+import math
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
-import pandas as pd
-import pandera as pa
-from pydantic import BaseModel, Field, validator
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, ValidationInfo, field_validator
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import pandera as pa
 
-# Pandera schema for DataFrame validation
-class HealthcareFormSchema(pa.SchemaModel):
-    """Pandera schema for validating healthcare form data."""
-    
-    patient_name: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's full name"
-    )
-    
-    date_of_birth: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's date of birth"
-    )
-    
-    gender: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's gender"
-    )
-    
-    address: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's full address"
-    )
-    
-    phone_number: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's phone number"
-    )
-    
-    email: pa.typing.Series[str] = pa.Field(
-        nullable=True,
-        coerce=True,
-        description="Patient's email address"
-    )
-    
-    insurance_provider: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Name of the insurance provider"
-    )
-    
-    insurance_id: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Insurance ID or policy number"
-    )
-    
-    primary_complaint: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Patient's primary complaint or reason for visit"
-    )
+
+# Columns checked by the DataFrame schema, with their descriptions; all are
+# nullable strings (null values are allowed for error cases)
+SCHEMA_DESCRIPTIONS = {
+    "patient_name": "Patient's full name",
+    "date_of_birth": "Patient's date of birth",
+    "gender": "Patient's gender",
+    "address": "Patient's full address",
+    "phone_number": "Patient's phone number",
+    "email": "Patient's email address",
+    "insurance_provider": "Name of the insurance provider",
+    "insurance_id": "Insurance ID or policy number",
+    "primary_complaint": "Patient's primary complaint or reason for visit",
+    "appointment_date": "Date of appointment",
+    "doctor_name": "Name of the doctor"
+}
+SCHEMA_FIELDS = tuple(SCHEMA_DESCRIPTIONS)
+
+# Module attributes resolving to the Pandera schema (HealthcareFormSchema is its
+# former name, when it was declared as a SchemaModel)
+SCHEMA_ATTRIBUTES = ("DATAFRAME_SCHEMA", "HealthcareFormSchema")
+
+
+@lru_cache(maxsize=1)
+def get_dataframe_schema() -> "pa.DataFrameSchema":
+    """
+    Get the Pandera schema for DataFrame validation, importing Pandera on first use.
     
-    appointment_date: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
-        coerce=True,
-        description="Date of appointment"
-    )
+    Returns:
+        DataFrameSchema checking the SCHEMA_FIELDS columns
+    """
+    import pandera as pa
     
-    doctor_name: pa.typing.Series[str] = pa.Field(
-        nullable=True,  # Allow null values for error cases
+    return pa.DataFrameSchema(
+        {
+            name: pa.Column(str, nullable=True, coerce=True, description=description)
+            for name, description in SCHEMA_DESCRIPTIONS.items()
+        },
         coerce=True,
-        description="Name of the doctor"
+        strict=False,
+        name="HealthcareFormSchema",
+        description="Pandera schema for validating healthcare form data."
     )
-    
-    class Config:
-        """Pandera schema configuration."""
-        coerce = True
-        strict = False
 
 
-# Pydantic model for type validation
-class MedicalItem(BaseModel):
-    """Model for medical items like history, medications, allergies."""
-    name: str
-    details: Optional[str] = None
+def __getattr__(name: str) -> Any:
+    """Resolve the schema attributes lazily so that importing this module does not load Pandera."""
+    if name in SCHEMA_ATTRIBUTES:
+        return get_dataframe_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+# String fields that are required in the output, and list fields
+REQUIRED_FIELDS = (
+    "patient_name", "date_of_birth", "gender", "address", "phone_number",
+    "insurance_provider", "insurance_id", "primary_complaint"
+)
+LIST_FIELDS = ("medical_history", "current_medications", "allergies")
+
+# Free-text fields whose scalar values of SCALAR_TYPES (e.g. numbers returned by the
+# LLM) are converted to strings before validation; dates are left to validate_date_format
+TEXT_FIELDS = (
+    "patient_name", "gender", "address", "phone_number", "email",
+    "insurance_provider", "insurance_id", "primary_complaint", "doctor_name"
+)
+SCALAR_TYPES = (int, float, bool)
+
+# Number of distinct payloads whose validation results are memoized
+VALIDATION_CACHE_SIZE = 1024
+
+# Types of the values that come back unchanged from a JSON round trip; only payloads
+# made of these (directly or in lists) are memoized
+JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Canonical gender values, keyed by their lowercase spelling
+GENDERS = {gender.lower(): gender for gender in ("Male", "Female", "Other", "Prefer not to say")}
+
+# Date formats recognized in extracted dates (ASCII digits only)
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}", re.ASCII)
+US_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})", re.ASCII)
+
+
+# Pydantic model for type validation
 class FormData(BaseModel):
     """Pydantic model for validated healthcare form data."""
     
+    # BaseModel already keeps its bookkeeping attributes in __slots__; the field
+    # values themselves have to live in the instance __dict__, so FormData cannot
+    # be slotted further without leaving Pydantic
+    
     patient_name: str = "Unable to extract"
     date_of_birth: str = "Unknown"
     gender: str = "Unknown"
@@ -104,43 +113,63 @@ class FormData(BaseModel):
     email: Optional[str] = None
     insurance_provider: str = "Unknown"
     insurance_id: str = "Unknown"
-    medical_history: List[Union[str, MedicalItem]] = Field(default_factory=list)
-    current_medications: List[Union[str, MedicalItem]] = Field(default_factory=list)
-    allergies: List[Union[str, MedicalItem]] = Field(default_factory=list)
+    medical_history: List[str] = Field(default_factory=list)
+    current_medications: List[str] = Field(default_factory=list)
+    allergies: List[str] = Field(default_factory=list)
     primary_complaint: str = "Unable to extract"
     appointment_date: Optional[str] = None
     doctor_name: Optional[str] = None
     
-    @validator('gender')
+    @field_validator('gender')
+    @classmethod
     def validate_gender(cls, v):
         """Validate gender field."""
         if not v or v == "Unknown":
             return "Unknown"
-        valid_genders = ["Male", "Female", "Other", "Prefer not to say"]
-        if v.title() in valid_genders:
-            return v.title()
-        return v
+        return GENDERS.get(v.lower(), v)
     
-    @validator('date_of_birth', 'appointment_date')
-    def validate_date_format(cls, v):
+    @field_validator('date_of_birth', 'appointment_date', mode='before')
+    @classmethod
+    def validate_date_format(cls, v, info: ValidationInfo):
         """Validate date format."""
         if not v:
             return None if v is None else v
         
         # Basic format check (more sophisticated validation could be added)
         if not isinstance(v, str):
-            return "Unknown" if v == 'date_of_birth' else None
+            return "Unknown" if info.field_name == 'date_of_birth' else None
         
-        try:
-            # Try to parse the date
-            datetime.strptime(v, "%Y-%m-%d")
-            return v
-        except ValueError:
-            # If date format is invalid, try to fix it or return as is
+        # Dates already in YYYY-MM-DD format are kept as is; the length and
+        # separator checks reject most other values before running the regex
+        if len(v) == 10 and v[4] == "-" and ISO_DATE_RE.fullmatch(v):
             return v
+        
+        # Convert MM/DD/YYYY dates, otherwise return the value as is
+        match = US_DATE_RE.fullmatch(v.strip())
+        if match:
+            month, day, year = match.groups()
+            return f"{year}-{int(month):02d}-{int(day):02d}"
+        return v
+
+
+# Placeholder returned when validation fails, built once without running the
+# field validators since the values are known to be valid
+ERROR_FORM_DATA = FormData.model_construct(
+    patient_name="Error in validation",
+    date_of_birth="Unknown",
+    gender="Unknown",
+    address="Error in validation",
+    phone_number="Unknown",
+    insurance_provider="Unknown",
+    insurance_id="Unknown",
+    primary_complaint="Error in validation"
+)
+
+# Validator for batches of forms, built once at import
+FORM_DATA_LIST = TypeAdapter(List[FormData])
 
 
-def validate_dataframe(data: Dict[str, Any]) -> pd.DataFrame:
+def validate_dataframe(data: Dict[str, Any]) -> "pd.DataFrame":
     """
     Validate data using Pandera schema.
     
@@ -150,12 +179,16 @@ def validate_dataframe(data: Dict[str, Any]) -> pd.DataFrame:
     Returns:
         Validated DataFrame
     """
-    # Convert dictionary to DataFrame
-    df = pd.DataFrame([data])
+    import pandas as pd
+    import pandera as pa
+    
+    # Convert dictionary to a one-row DataFrame, building each column directly
+    # instead of letting pandas infer the columns from a list of records
+    df = pd.DataFrame({key: [value] for key, value in data.items()})
     
     try:
         # Validate with Pandera schema
-        validated_df = HealthcareFormSchema.validate(df)
+        validated_df = get_dataframe_schema().validate(df, inplace=True)
         return validated_df
     except pa.errors.SchemaError as e:
         # Log validation errors
@@ -165,33 +198,104 @@ def validate_dataframe(data: Dict[str, Any]) -> pd.DataFrame:
         return df
 
 
-def validate(data: Dict[str, Any]) -> FormData:
+def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Validate extracted form data.
+    Normalize extracted form data in place before Pydantic validation.
     
     Args:
         data: Dictionary containing extracted form data
         
     Returns:
-        Validated FormData object
+        The same dictionary, with nulls replaced and list and text fields converted
     """
     # Handle None values for required string fields
-    for field in ['patient_name', 'date_of_birth', 'gender', 'address', 'phone_number', 
-                 'insurance_provider', 'insurance_id', 'primary_complaint']:
-        if field in data and data[field] is None:
+    for field in REQUIRED_FIELDS:
+        if data.get(field, "") is None:
             data[field] = "Unknown"
     
     # Convert list fields to proper format
-    for list_field in ['medical_history', 'current_medications', 'allergies']:
-        if list_field in data:
-            if data[list_field] is None:
+    for list_field in LIST_FIELDS:
+        value = data.get(list_field, ())
+        if value is None:
+            data[list_field] = []
+        elif type(value) is str:
+            # Convert string to list if needed, skipping the split for single items
+            if not value:
                 data[list_field] = []
-            elif isinstance(data[list_field], str):
-                # Convert string to list if needed
-                if data[list_field]:
-                    data[list_field] = [item.strip() for item in data[list_field].split(',')]
-                else:
-                    data[list_field] = []
+            elif ',' not in value:
+                data[list_field] = [value.strip()]
+            else:
+                data[list_field] = [item.strip() for item in value.split(',')]
+    
+    # Convert numbers and booleans in text fields so they do not fail validation;
+    # lists and dicts are left to fail instead of becoming their repr
+    for field in TEXT_FIELDS:
+        value = data.get(field)
+        if type(value) in SCALAR_TYPES:
+            data[field] = str(value)
+    
+    return data
+
+
+def validate(data: Dict[str, Any]) -> FormData:
+    """
+    Validate extracted form data.
+    
+    The caller's dictionary is never modified; normalization works on a copy.
+    Payloads whose values are all JSON scalars or lists of them are memoized
+    by content, so identical payloads (retries, re-sent forms) skip validation;
+    each call still returns its own copy. Any other payload (datetimes, NaN,
+    nested objects) is validated as given, without the cache, as a JSON round
+    trip would change it.
+    
+    Args:
+        data: Dictionary containing extracted form data
+        
+    Returns:
+        Validated FormData object
+    """
+    if not _is_plain_json(data):
+        return _validate(dict(data))
+    
+    # Key the memoized results by the canonical JSON encoding of the payload, which
+    # tells apart values that compare equal in Python (1, 1.0 and True); integers
+    # too large for orjson are validated without the cache
+    try:
+        key = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return _validate(dict(data))
+    
+    # Copy the shared result; the string fields are immutable, so only the lists need copying
+    result = _validate_json(key)
+    return result.model_copy(update={field: list(getattr(result, field)) for field in LIST_FIELDS})
+
+
+def _is_plain_json(data: Dict[str, Any]) -> bool:
+    """Check that every value is a JSON scalar, or a list of them, that survives a JSON round trip."""
+    for value in data.values():
+        for item in (value if type(value) is list else (value,)):
+            if type(item) not in JSON_SCALAR_TYPES or (type(item) is float and not math.isfinite(item)):
+                return False
+    return True
+
+
+@lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validate_json(key: bytes) -> FormData:
+    """Validate form data given as its JSON encoding."""
+    return _validate(orjson.loads(key))
+
+
+def _validate(data: Dict[str, Any]) -> FormData:
+    """
+    Normalize and validate form data with the Pydantic model.
+    
+    Args:
+        data: Dictionary containing extracted form data
+        
+    Returns:
+        Validated FormData object, or a placeholder object if validation fails
+    """
+    _normalize(data)
     
     try:
         # Validate with Pydantic model
@@ -201,14 +305,33 @@ def validate(data: Dict[str, Any]) -> FormData:
         # Log validation errors
         print(f"Pydantic validation error: {str(e)}")
         
-        # Create a minimal valid object for fallback
-        return FormData(
-            patient_name="Error in validation",
-            date_of_birth="Unknown",
-            gender="Unknown",
-            address="Error in validation",
-            phone_number="Unknown",
-            insurance_provider="Unknown",
-            insurance_id="Unknown",
-            primary_complaint=f"Error in validation: {str(e)}"
-        )
+        # Copy the precomputed placeholder object, adding the error message; the
+        # copy is shallow, so each result gets its own empty lists
+        return ERROR_FORM_DATA.model_copy(update={
+            "primary_complaint": f"Error in validation: {str(e)}",
+            "medical_history": [],
+            "current_medications": [],
+            "allergies": []
+        })
+
+
+def validate_many(records: List[Dict[str, Any]]) -> List[FormData]:
+    """
+    Validate a batch of extracted forms with a single Pydantic call.
+    
+    If any record fails, the batch is validated again record by record so that
+    only the invalid records are replaced by the fallback object of validate().
+    
+    Args:
+        records: Dictionaries containing extracted form data
+        
+    Returns:
+        Validated FormData objects, in the order of the records
+    """
+    for data in records:
+        _normalize(data)
+    
+    try:
+        return FORM_DATA_LIST.validate_python(records)
+    except ValidationError:
+        return [_validate(data) for data in records]